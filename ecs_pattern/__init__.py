@@ -3,6 +3,7 @@
 # Mirror: https://gitflic.ru/project/ikvk/ecs-pattern
 # License: Apache-2.0
 
-from .ecs import component, entity, EntityManager, System, SystemManager
+from .ecs import component, entity, EntityManager, EventReader, Prefab, Query, ResourceNotFoundError, System, \
+    VectorSystem, SystemManager
 
-__version__ = '1.4.0'
+__version__ = '1.5.0'
@@ -2,88 +2,1367 @@
 ECS - Entity Component system
 """
 
-from typing import Iterable, Iterator, Any
-from dataclasses import dataclass
-from functools import partial
-from collections import deque
+from typing import Iterable, Iterator, Any, Tuple, Callable, Union
+from dataclasses import dataclass, fields, MISSING, InitVar
+from types import FunctionType
+from heapq import heappush, heappop, heapify
+from operator import attrgetter
+from itertools import chain, repeat
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from os import cpu_count
+from threading import local, Lock
+from time import perf_counter
 
-# all component classes must be decorated with this function
-# 3 class with @dataclass(slots=True) - A, B, C, then C(A, B): TypeError: multiple bases have instance lay-out conflict
-component = dataclass
+try:
+    import numpy  # *optional, for columnar storage
+except ImportError:
+    numpy = None
 
-# all entity classes must be decorated with this function
-entity = partial(dataclass, slots=True)
+
+class _ComponentMeta(type):
+    """
+    Metaclass of component classes
+    Component class has empty __slots__, it is only a base for entities,
+    so direct component instance is created from its cached subclass with __dict__
+    Instance is pickled by component class, the subclass is not importable
+    """
+    _instance_class_map = {}  # ComPosition: ComPosition subclass with __dict__
+
+    def _instance_class(cls) -> type:
+        """Get cached subclass with __dict__ for direct instances of component class"""
+        try:
+            return _ComponentMeta._instance_class_map[cls]
+        except KeyError:
+            cls_dict = {'__qualname__': cls.__qualname__, '__module__': cls.__module__}
+            if cls.__reduce__ is object.__reduce__:
+                cls_dict['__reduce__'] = _reduce_component
+            instance_class = _ComponentMeta._instance_class_map[cls] = type.__new__(
+                _EntityMeta, cls.__name__, (cls,), cls_dict)
+            return instance_class
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            instance_class = _ComponentMeta._instance_class_map[cls]
+        except KeyError:
+            instance_class = cls._instance_class()
+        return instance_class(*args, **kwargs)
+
+
+def _new_component(component_class: type) -> Any:
+    """Create empty direct instance of component class, for unpickling"""
+    instance_class = component_class._instance_class()
+    return instance_class.__new__(instance_class)
+
+
+def _reduce_component(self) -> tuple:
+    """Pickle direct instance of component by its public component class"""
+    return _new_component, (self.__class__.__bases__[0],), self.__dict__
+
+
+class _EntityMeta(_ComponentMeta):
+    """Metaclass of entity classes, instances are created by type.__call__ without python level overhead"""
+    __call__ = type.__call__
+
+
+def _rebuild_class(cls: type, metaclass: type, slots: tuple = None, bases: tuple = None) -> type:
+    """Create copy of the class with specified metaclass, optionally with __slots__ and other base classes"""
+    cls_dict = dict(cls.__dict__)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict['__qualname__'] = cls.__qualname__
+    if slots is not None:
+        cls_dict['__slots__'] = slots
+    return metaclass(cls.__name__, cls.__bases__ if bases is None else bases, cls_dict)
+
+
+class _ChangeClock:
+    """Change tick: SystemManager increments it before each system update, tracked fields save it on set"""
+    tick = 1
+
+
+class _ChangeTickSlot:
+    """
+    Base of entity with tracked components
+    Its subclass made by entity has slot with change tick per tracked component: _ecs_tick_0, _ecs_tick_1
+    """
+    __slots__ = ()
+
+
+class _TrackedField:
+    """Data descriptor of entity field of tracked components, saves change tick of the components on set"""
+    __slots__ = ('member', 'tick_member_list')
+
+    def __init__(self, member: Any, tick_member_list: Tuple[Any, ...]):
+        self.member = member  # slot descriptor
+        self.tick_member_list = tick_member_list  # slot descriptors of change ticks of components with the field
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.member.__get__(obj, objtype)
+
+    def __set__(self, obj, value):
+        self.member.__set__(obj, value)
+        for tick_member in self.tick_member_list:
+            tick_member.__set__(obj, _ChangeClock.tick)
+
+    def __delete__(self, obj):
+        self.member.__delete__(obj)
+
+
+_tracked_component_map = {}  # component class with track_changes=True: name of its change tick slot
+
+
+def component(cls: type = None, track_changes: bool = False, **kwargs):
+    """
+    All component classes must be decorated with this function
+    Component is dataclass with empty __slots__: entity creates real slots for all fields of its components once
+    @dataclass(slots=True) for A, B and C(A, B): TypeError: multiple bases have instance lay-out conflict
+    track_changes: entities save change tick on set of component fields, see EntityManager.get_changed
+        field access of such entities is slower
+    kwargs: dataclass arguments
+    """
+
+    def wrap(cls_):
+        component_class = dataclass(_rebuild_class(cls_, _ComponentMeta, ()), **kwargs)
+        if track_changes:
+            _tracked_component_map[component_class] = '_ecs_tick_{}'.format(len(_tracked_component_map))
+        return component_class
+
+    return wrap if cls is None else wrap(cls)
+
+
+_FACTORY = object()  # default value of generated __init__ argument for field with default_factory
+_method_code_map = {}  # (method name, field layout): code object of generated method, shared by entity classes
+
+
+def _make_method(entity_class: type, method_name: str, layout: tuple, source: str, method_globals: dict,
+                 defaults: tuple = None) -> FunctionType:
+    """Make method of entity class from code object cached by field layout, compile source on the first call"""
+    key = (method_name, layout)
+    try:
+        code = _method_code_map[key]
+    except KeyError:
+        namespace = {}
+        exec(source, {}, namespace)
+        code = _method_code_map[key] = namespace[method_name].__code__
+    method = FunctionType(code, method_globals, method_name, defaults)
+    method.__qualname__ = '{}.{}'.format(entity_class.__qualname__, method_name)
+    return method
+
+
+def _from_tuple(cls, values: Iterable[Any]):
+    """Create entity by positional field values"""
+    return cls(*values)
+
+
+def _set_fast_methods(entity_class: type, init: bool, repr_: bool, eq: bool):
+    """Set __init__, __repr__, __eq__ and from_tuple of entity class, see entity(fast_init=True)"""
+    field_list = fields(entity_class)
+    if entity_class.__dataclass_params__.frozen or any(not i.init or i.kw_only for i in field_list) or any(
+            map(_is_init_var, entity_class.__dataclass_fields__.values())):
+        raise TypeError('fast_init of {} supports only mutable init fields without kw_only and InitVar'.format(
+            entity_class.__qualname__))
+    name_list = tuple(i.name for i in field_list)
+    method_globals = {'_FACTORY': _FACTORY, '__builtins__': __builtins__}
+    if init:
+        kind_list = []  # r - required, d - default, f - default_factory
+        default_list = []
+        for entity_field in field_list:
+            if entity_field.default is not MISSING:
+                kind_list.append('d')
+                default_list.append(entity_field.default)
+            elif entity_field.default_factory is not MISSING:
+                kind_list.append('f')
+                default_list.append(_FACTORY)
+                method_globals['_factory_{}'.format(entity_field.name)] = entity_field.default_factory
+            elif default_list:
+                raise TypeError('non-default argument {!r} follows default argument'.format(entity_field.name))
+            else:
+                kind_list.append('r')
+        post_init = hasattr(entity_class, '__post_init__')
+        body = ['self.{0} = _factory_{0}() if {0} is _FACTORY else {0}'.format(name) if kind == 'f' else
+                'self.{0} = {0}'.format(name) for name, kind in zip(name_list, kind_list)]
+        if post_init:
+            body.append('self.__post_init__()')
+        entity_class.__init__ = _make_method(
+            entity_class, '__init__', (name_list, tuple(kind_list), post_init),
+            'def __init__(self{}):\n    {}'.format(
+                ''.join(', ' + i for i in name_list), '\n    '.join(body or ['pass'])),
+            method_globals, tuple(default_list) or None)
+        entity_class.from_tuple = classmethod(_from_tuple)
+    if repr_:
+        entity_class.__repr__ = _make_method(
+            entity_class, '__repr__', name_list,
+            'def __repr__(self):\n    return self.__class__.__qualname__ + f"({})"'.format(
+                ', '.join('{0}={{self.{0}!r}}'.format(i) for i in name_list)),
+            method_globals)
+    if eq:
+        entity_class.__eq__ = _make_method(
+            entity_class, '__eq__', name_list,
+            'def __eq__(self, other):\n'
+            '    if other.__class__ is self.__class__:\n'
+            '        return ({}) == ({})\n'
+            '    return NotImplemented'.format(
+                ''.join('self.{},'.format(i) for i in name_list), ''.join('other.{},'.format(i) for i in name_list)),
+            method_globals)
+        entity_class.__hash__ = None
+
+
+def entity(cls: type = None, fast_init: bool = False, **kwargs):
+    """
+    All entity classes must be decorated with this function
+    Entity is dataclass with slots=True, instances have no __dict__
+    raise TypeError for entity with __dict__ - all base classes must be components
+    fast_init: __init__, __repr__, __eq__ are made from code cached by field layout instead of dataclass code
+        generation - cheaper decoration of many entity classes, adds from_tuple(values) classmethod
+    kwargs: dataclass arguments
+    """
+
+    def wrap(cls_):
+        tracked_component_list = tuple(i for i in cls_.__mro__ if i in _tracked_component_map)
+        bases = cls_.__bases__
+        # *tick slots of tracked components of base entity are inherited
+        tick_slot_list = tuple(
+            _tracked_component_map[i] for i in tracked_component_list if not hasattr(cls_, _tracked_component_map[i]))
+        if tick_slot_list:
+            # *base entity has slots, so base with tick slots must be its subclass - against lay-out conflict
+            base_entity = next((i for i in bases if isinstance(i, _EntityMeta)), None)
+            tick_slot_base = type(_ChangeTickSlot)('_ChangeTickSlot', (
+                (base_entity, _ChangeTickSlot) if base_entity else (_ChangeTickSlot,)), {'__slots__': tick_slot_list})
+            if base_entity:
+                bases = tuple(tick_slot_base if i is base_entity else i for i in bases)
+            else:
+                bases += (tick_slot_base,)
+        if fast_init:
+            # order and unsafe_hash need dataclass __eq__
+            fast_method_map = {
+                'init': kwargs.get('init', True),
+                'repr': kwargs.get('repr', True),
+                'eq': kwargs.get('eq', True) and not kwargs.get('order') and not kwargs.get('unsafe_hash'),
+            }
+            entity_class = dataclass(_rebuild_class(cls_, _EntityMeta, bases=bases), slots=True,
+                                     **{**kwargs, **{k: False for k, v in fast_method_map.items() if v}})
+        else:
+            entity_class = dataclass(_rebuild_class(cls_, _EntityMeta, bases=bases), slots=True, **kwargs)
+        if entity_class.__dictoffset__ or entity_class.__weakrefoffset__:
+            raise TypeError('Entity {} has __dict__, all its base classes must be components'.format(
+                entity_class.__qualname__))
+        for field_name in {i.name for c in tracked_component_list for i in fields(c)}:
+            member = getattr(entity_class, field_name)  # *slot descriptor or _TrackedField of base entity
+            entity_class_field = _TrackedField(member.member if isinstance(member, _TrackedField) else member, tuple(
+                getattr(entity_class, _tracked_component_map[i])
+                for i in tracked_component_list if field_name in i.__dataclass_fields__))
+            setattr(entity_class, field_name, entity_class_field)
+        if fast_init:
+            _set_fast_methods(entity_class, fast_method_map['init'], fast_method_map['repr'], fast_method_map['eq'])
+        return entity_class
+
+    return wrap if cls is None else wrap(cls)
+
+
+class ResourceNotFoundError(KeyError):
+    """Resource of the class is not set, see EntityManager.set_resource"""
+
+    def __str__(self):
+        return 'Resource is not set: {}'.format(getattr(self.args[0], '__qualname__', self.args[0]))
+
+
+# query plan cache statistics, see EntityManager.query_cache_info
+QueryCacheInfo = namedtuple('QueryCacheInfo', ('hits', 'misses', 'size'))
+
+# entity pool statistics, see EntityManager.pool_info
+PoolInfo = namedtuple('PoolInfo', ('size', 'max_size', 'hits', 'misses', 'high_water'))
+
+# field types allowed for columnar storage: numpy dtype
+_COLUMN_DTYPE_MAP = {
+    int: 'int64', float: 'float64', bool: 'bool',
+    'int': 'int64', 'float': 'float64', 'bool': 'bool',
+}
+_COLUMN_CAPACITY_MIN = 64
+
+# field types to cast scatter values to: name of builtin
+_SCATTER_TYPE_MAP = {int: 'int', bool: 'bool', 'int': 'int', 'bool': 'bool'}
+
+# entity id: generation << _ID_INDEX_BITS | index
+_ID_INDEX_BITS = 32
+_ID_INDEX_MASK = (1 << _ID_INDEX_BITS) - 1
+
+# stale entries of expiration heap allowed over 2x of timers count, see EntityManager.set_expire
+_EXPIRE_HEAP_SLACK = 64
+
+
+class _ColumnField:
+    """
+    Data descriptor of row proxy field, value is stored in numpy array of columnar storage
+    Deleted row proxy keeps its last values in slot of entity class
+    """
+    __slots__ = ('columns', 'name', 'member')
+
+    def __init__(self, columns: dict, name: str, member: Any):
+        self.columns = columns
+        self.name = name
+        self.member = member  # slot descriptor of entity class
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return self.columns[self.name].item(obj._ecs_row)
+        except AttributeError:
+            return self.member.__get__(obj, objtype)
+
+    def __set__(self, obj, value):
+        try:
+            self.columns[self.name][obj._ecs_row] = value
+        except AttributeError:
+            self.member.__set__(obj, value)
+
+
+class _ColumnStore:
+    """
+    Columnar storage of numeric entity class: each field is stored in contiguous numpy array
+    Entities are row proxies - subclass of entity class, their fields are views of array cells
+    Delete: the last row takes place of the deleted one
+    """
+
+    def __init__(self, entity_class: type):
+        if issubclass(entity_class, _ChangeTickSlot):
+            raise TypeError('Entity class {} has components with track_changes, columnar storage is impossible'.format(
+                entity_class.__qualname__))
+        if numpy is None:
+            raise ImportError('numpy is required for columnar storage')
+        self.columns = {}  # x: array([1., 2.])
+        for entity_field in fields(entity_class):
+            try:
+                dtype = _COLUMN_DTYPE_MAP[entity_field.type]
+            except (KeyError, TypeError):
+                raise TypeError('Field {}.{} is not int, float or bool, columnar storage is impossible'.format(
+                    entity_class.__qualname__, entity_field.name)) from None
+            self.columns[entity_field.name] = numpy.empty(_COLUMN_CAPACITY_MIN, dtype=dtype)
+        self.entity_class = entity_class
+        self.row_class = type(entity_class)(entity_class.__name__, (entity_class,), {
+            '__slots__': ('_ecs_row',),
+            '__qualname__': entity_class.__qualname__,
+            '__module__': entity_class.__module__,
+            **{name: _ColumnField(self.columns, name, entity_class.__dict__[name]) for name in self.columns},
+        })
+        self.entity_list = []  # [row_proxy1, row_proxy2]
+
+    def append(self, entity_value: Any) -> Any:
+        """
+        Copy entity field values into new row, add row proxy and get it
+        Deleted row proxy is added back itself
+        """
+        if entity_value.__class__ is self.row_class:
+            if hasattr(entity_value, '_ecs_row'):
+                raise ValueError('Entity is already in EntityManager: {}'.format(entity_value))
+            row_proxy = entity_value
+        else:
+            row_proxy = self.row_class.__new__(self.row_class)
+        row = len(self.entity_list)
+        for name, column in self.columns.items():
+            if row == len(column):
+                column = self.columns[name] = numpy.resize(column, row * 2)
+            column[row] = getattr(entity_value, name)
+        row_proxy._ecs_row = row
+        self.entity_list.append(row_proxy)
+        return row_proxy
+
+    def extend(self, count: int, value_map: dict) -> list:
+        """Write values into new rows directly: scalar or sequence of count items per field, get new row proxies"""
+        row = len(self.entity_list)
+        for name, column in self.columns.items():
+            if row + count > len(column):
+                column = self.columns[name] = numpy.resize(column, max((row + count) * 2, _COLUMN_CAPACITY_MIN))
+            column[row:row + count] = value_map[name]
+        row_class = self.row_class
+        row_proxy_list = []
+        for i in range(row, row + count):
+            row_proxy = row_class.__new__(row_class)
+            row_proxy._ecs_row = i
+            row_proxy_list.append(row_proxy)
+        self.entity_list.extend(row_proxy_list)
+        return row_proxy_list
+
+    def delete(self, row_proxy: Any):
+        """Delete row, the last row takes place of the deleted one"""
+        try:
+            row = row_proxy._ecs_row
+        except AttributeError:
+            raise ValueError('Entity is not in EntityManager: deleted row proxy') from None
+        self.detach(row_proxy)
+        last_row_proxy = self.entity_list.pop()
+        if row < len(self.entity_list):
+            last_row = len(self.entity_list)
+            for column in self.columns.values():
+                column[row] = column[last_row]
+            self.entity_list[row] = last_row_proxy
+            last_row_proxy._ecs_row = row
+
+    def detach(self, row_proxy: Any):
+        """Save field values of row proxy into its slots before deletion of its row"""
+        row = row_proxy._ecs_row
+        del row_proxy._ecs_row
+        for name, column in self.columns.items():
+            setattr(row_proxy, name, column.item(row))
+
+
+class _FieldBridge:
+    """
+    Gather fields of entities into reusable numpy buffer and scatter them back
+    Buffer: row per field, column per entity
+    Values of int and bool fields are cast back to field type on scatter
+    """
+
+    def __init__(self, field_name_list: Tuple[str, ...], dtype: type, field_type_map: dict):
+        if numpy is None:
+            raise ImportError('numpy is required for gather/scatter')
+        for field_name in field_name_list:
+            if not field_name.isidentifier():
+                raise ValueError('Wrong field name: {}'.format(field_name))
+        self.getter = attrgetter(*field_name_list)
+        value_list = []
+        for num, field_name in enumerate(field_name_list):
+            field_type = _SCATTER_TYPE_MAP.get(field_type_map.get(field_name))
+            value_list.append('{}(values[{}])'.format(field_type, num) if field_type else 'values[{}]'.format(num))
+        namespace = {}
+        exec('def attrsetter(obj, values):\n    {}, = {},'.format(
+            ', '.join('obj.{}'.format(i) for i in field_name_list), ', '.join(value_list)), namespace)
+        self.setter = namespace['attrsetter']
+        self.buffer = numpy.empty((len(field_name_list), _COLUMN_CAPACITY_MIN), dtype=dtype)
+        self.entity_list = []
+
+    def gather(self, entity_iter: Iterable[Any]) -> tuple:
+        """Save entities and copy their fields into buffer, get buffer rows"""
+        entity_list = self.entity_list = list(entity_iter)
+        entity_cnt = len(entity_list)
+        if entity_cnt > self.buffer.shape[1]:
+            self.buffer = numpy.empty((len(self.buffer), entity_cnt * 2), dtype=self.buffer.dtype)
+        view = self.buffer[:, :entity_cnt]
+        if entity_cnt:
+            if len(view) == 1:
+                view[0] = list(map(self.getter, entity_list))
+            else:
+                view.T[...] = list(map(self.getter, entity_list))
+        return tuple(view)
+
+    def scatter(self):
+        """Copy buffer values into fields of saved entities"""
+        setter = self.setter
+        for entity_value, value_list in zip(self.entity_list, self.buffer[:, :len(self.entity_list)].T.tolist()):
+            setter(entity_value, value_list)
+
+
+class _EntityPool:
+    """Deleted entities of one entity class for reuse, entity added to world again is removed from pool"""
+    __slots__ = ('free_map', 'max_size', 'hits', 'misses', 'high_water')
+
+    def __init__(self):
+        self.free_map = {}  # id(spark1): spark1 - last put is taken first
+        self.max_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.high_water = 0
+
+    def put(self, entity_value: Any):
+        """Save deleted entity if pool is not full"""
+        if len(self.free_map) < self.max_size:
+            self.free_map[id(entity_value)] = entity_value
+            if len(self.free_map) > self.high_water:
+                self.high_water = len(self.free_map)
+
+
+_worker_pool_map = {}  # workers count: ThreadPoolExecutor - shared by EntityManager.parallel_for calls
+_worker_local = local()  # is_worker: True in threads of shared pools
+
+
+def _init_worker():
+    """Mark thread of shared pool, nested parallel_for runs in it inline"""
+    _worker_local.is_worker = True
+
+
+def _worker_pool(workers: int) -> ThreadPoolExecutor:
+    """Get shared thread pool with the workers count, create it on the first call"""
+    try:
+        return _worker_pool_map[workers]
+    except KeyError:
+        worker_pool = _worker_pool_map[workers] = ThreadPoolExecutor(
+            workers, thread_name_prefix='ecs_worker', initializer=_init_worker)
+        return worker_pool
+
+
+class _EventChannel:
+    """
+    Events of one event class for the previous and the current frame
+    Event number is absolute: number of event in list + offset
+    """
+    __slots__ = ('event_list', 'offset', 'frame_start')
+
+    def __init__(self):
+        self.event_list = []
+        self.offset = 0  # number of event_list[0]
+        self.frame_start = 0  # number of the first event of the current frame
+
+    def update(self):
+        """Drop events of the previous frame, the current frame becomes previous"""
+        del self.event_list[:self.frame_start - self.offset]
+        self.offset = self.frame_start
+        self.frame_start = self.offset + len(self.event_list)
+
+
+def _is_init_var(entity_field: Any) -> bool:
+    """Check that dataclass field is InitVar pseudo-field"""
+    return isinstance(entity_field.type, InitVar) or entity_field.type is InitVar
+
+
+def _init_fields(entity_class: type) -> list:
+    """Get init fields and InitVar pseudo-fields of entity class in order of __init__ arguments"""
+    field_name_set = {i.name for i in fields(entity_class)}
+    return [i for i in entity_class.__dataclass_fields__.values()
+            if i.init and (i.name in field_name_set or _is_init_var(i))]
+
+
+class Prefab:
+    """
+    Template of entity: entity class and default field values, see EntityManager.spawn_many
+    Default values are shared by all spawned entities, use immutable values
+    """
+    __slots__ = ('entity_class', 'defaults')
+
+    def __init__(self, entity_class_val: type, **defaults):
+        field_name_set = {i.name for i in fields(entity_class_val)} | {i.name for i in _init_fields(entity_class_val)}
+        for name in defaults:
+            if name not in field_name_set:
+                raise TypeError('{} has no field {}'.format(entity_class_val.__qualname__, name))
+        self.entity_class = entity_class_val
+        self.defaults = defaults
+
+    def __repr__(self):
+        return 'Prefab({}, {})'.format(self.entity_class.__qualname__, self.defaults)
 
 
 class EntityManager:
     """Entity manager"""
 
-    def __init__(self):
+    def __init__(self, stable_order: bool = False):
+        """
+        stable_order:
+            False - delete entity in O(1): the last entity of the class takes place of the deleted one
+            True - keep insertion order: deleted places marked as tombstones, lists are compacted before next access
+        """
+        self._stable_order = stable_order
         self._entity_map = {}  # Person: [ent1, ent2]
-        self._entity_components_map = {}  # Person: {MoveCom, DamageCom, NameCom}
-        # *needed for set().issubset()
-        self._set_cache_map = {}  # (MoveCom, DamageCom, NameCom): {MoveCom, DamageCom, NameCom}
-        self._delete_entity_buffer = deque()  # deque([Person1, Person2])
+        self._entity_index_map = {}  # Person: {id(ent1): 0, id(ent2): 1}
+        self._tombstone_map = {}  # Person: [1] - places of deleted entities, for stable_order only
+        self._compact_lock = Lock()  # *readers of parallel systems compact lists once
+        self._column_store_map = {}  # Particle: _ColumnStore, ParticleRowProxy: _ColumnStore
+        # *component index: bit per component class, mask per entity class
+        self._component_bit_map = {}  # MoveCom: 0b001, DamageCom: 0b010, NameCom: 0b100
+        self._component_entity_map = {}  # MoveCom: [Person, Monster] - entity classes that contains component
+        self._entity_mask_map = {}  # Person: 0b111
+        # *cleared when a new entity class appears
+        self._plan_version = 0  # increases when a new entity class appears, for Query
+        self._query_plan_map = {}  # (MoveCom, DamageCom): ([person1, person2], [monster1])
+        self._column_plan_map = {}  # (MoveCom, DamageCom): (_ColumnStore1, _ColumnStore2)
+        self._field_bridge_map = {}  # (('x', 'y'), (MoveCom,), float): _FieldBridge
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+        self._delete_entity_buffer = deque()  # deque([id1, id2]) - ids, entity is skipped if it was deleted already
+        self._add_entity_buffer = {}  # {id(Person3): Person3} - in order of buffer_add
+        self._clear_class_buffer = deque()  # deque([Spark])
+        # id = generation << _ID_INDEX_BITS | index
+        self._id_entity_list = []  # index: entity or None
+        self._id_generation_list = []  # index: generation, increases on entity deletion
+        self._id_free_list = deque()  # indexes of deleted entities for reuse
+        self._entity_id_map = {}  # id(ent1): id
+        # expiration timers
+        self._expire_heap = []  # [(expire_at, entity_id)]
+        self._expire_map = {}  # entity_id: expire_at - last timer of entity
+        self._pool_map = {}  # Spark: _EntityPool
+        self._resource_map = {}  # GameData: game_data - singletons, not in world
+        self._event_channel_map = {}  # TeamScoredGoalEvent: _EventChannel
 
-    def add(self, *entity_value_list: Any):
-        """Add entities to world"""
+    def add(self, *entity_value_list: Any, expire_at: float = None):
+        """
+        Add entities to world, each entity gets integer id - see get_id
+        Entity of columnar class is copied into columns, world contains its row proxy
+        expire_at: time when entities should be deleted, see set_expire
+        raise ValueError for entity that is already in world
+        """
         for entity_value in entity_value_list:
-            assert getattr(entity_value, '__dict__', None) in (None, {}), 'Data class with inefficient memory usage'
             entity_value_class = entity_value.__class__
-            self._entity_map.setdefault(entity_value_class, []).append(entity_value)
-            if entity_value_class not in self._entity_components_map:
-                self._entity_components_map[entity_value_class] = \
-                    {i for i in entity_value_class.__mro__ if i is not object}
+            if entity_value_class in self._column_store_map:
+                entity_value = self._column_store_map[entity_value_class].append(entity_value)
+            else:
+                try:
+                    entity_list = self._entity_map[entity_value_class]
+                except KeyError:
+                    self.register(entity_value_class)
+                    entity_list = self._entity_map[entity_value_class]
+                entity_index = self._entity_index_map[entity_value_class]
+                if id(entity_value) in entity_index:
+                    raise ValueError('Entity is already in EntityManager: {}'.format(entity_value))
+                entity_index[id(entity_value)] = len(entity_list)
+                entity_list.append(entity_value)
+                if self._pool_map and entity_value_class in self._pool_map:
+                    self._pool_map[entity_value_class].free_map.pop(id(entity_value), None)
+            # id
+            if self._id_free_list:
+                id_index = self._id_free_list.popleft()
+                self._id_entity_list[id_index] = entity_value
+            else:
+                id_index = len(self._id_entity_list)
+                self._id_entity_list.append(entity_value)
+                self._id_generation_list.append(0)
+            self._entity_id_map[id(entity_value)] = self._id_generation_list[id_index] << _ID_INDEX_BITS | id_index
+            if expire_at is not None:
+                self.set_expire(expire_at, entity_value)
 
     def delete(self, *entity_value_list: Any):
-        """Delete entities from world"""
+        """
+        Delete entities from world, ids of deleted entities become invalid
+        raise ValueError for entity that is not in world
+        """
         for entity_value in entity_value_list:
-            self._entity_map[entity_value.__class__].remove(entity_value)
+            entity_value_class = entity_value.__class__
+            if entity_value_class in self._column_store_map:
+                self._column_store_map[entity_value_class].delete(entity_value)
+            else:
+                try:
+                    place = self._entity_index_map[entity_value_class].pop(id(entity_value))
+                except KeyError:
+                    if entity_value_class not in self._entity_index_map:
+                        raise
+                    raise ValueError('Entity is not in EntityManager: {}'.format(entity_value)) from None
+                if self._stable_order:
+                    self._tombstone_map.setdefault(entity_value_class, []).append(place)
+                else:
+                    entity_list = self._entity_map[entity_value_class]
+                    last_entity = entity_list.pop()
+                    if place < len(entity_list):
+                        entity_list[place] = last_entity
+                        self._entity_index_map[entity_value_class][id(last_entity)] = place
+            # id
+            entity_id = self._entity_id_map.pop(id(entity_value))
+            if self._expire_map:
+                self._expire_map.pop(entity_id, None)
+            id_index = entity_id & _ID_INDEX_MASK
+            self._id_entity_list[id_index] = None
+            self._id_generation_list[id_index] += 1
+            self._id_free_list.append(id_index)
+            # pool
+            if self._pool_map and entity_value_class in self._pool_map:
+                self._pool_map[entity_value_class].put(entity_value)
+
+    def get_id(self, entity_value: Any) -> int:
+        """
+        Get id of entity in world: generation and index of entity, id is not reused after entity deletion
+        raise KeyError for entity that is not in world
+        """
+        return self._entity_id_map[id(entity_value)]
+
+    def get(self, entity_id: int) -> Any:
+        """
+        Get entity by id
+        raise KeyError for id of deleted entity
+        """
+        id_index = entity_id & _ID_INDEX_MASK
+        if id_index < len(self._id_generation_list) and \
+                self._id_generation_list[id_index] == entity_id >> _ID_INDEX_BITS:
+            entity_value = self._id_entity_list[id_index]
+            if entity_value is not None:
+                return entity_value
+        raise KeyError(entity_id)
+
+    def is_alive(self, entity_id: int) -> bool:
+        """Check that entity with specified id is in world"""
+        id_index = entity_id & _ID_INDEX_MASK
+        return id_index < len(self._id_generation_list) and \
+            self._id_generation_list[id_index] == entity_id >> _ID_INDEX_BITS and \
+            self._id_entity_list[id_index] is not None
+
+    def _compact(self):
+        """
+        Remove tombstones of deleted entities from entity lists, for stable_order only
+        Thread safe: map of tombstones is checked again under lock and cleared after lists are compacted
+        """
+        with self._compact_lock:
+            for entity_class, place_list in self._tombstone_map.items():
+                place_set = set(place_list)
+                entity_list = self._entity_map[entity_class]
+                entity_list[:] = [ent for place, ent in enumerate(entity_list) if place not in place_set]
+                self._entity_index_map[entity_class] = {id(ent): place for place, ent in enumerate(entity_list)}
+            self._tombstone_map.clear()
 
     def delete_buffer_add(self, *entity_value_list: Any):
-        """Save entities into delete buffer for delete them from world later"""
+        """
+        Save entities into delete buffer for delete them from world later
+        Entity that waits in add buffer is removed from it, entity that is not in world is skipped
+        Buffer keeps entity ids: entity deleted and reused by pool before purge is not deleted again
+        """
+        add_entity_buffer = self._add_entity_buffer
         for entity_value in entity_value_list:
-            self._delete_entity_buffer.append(entity_value)
+            if add_entity_buffer:
+                add_entity_buffer.pop(id(entity_value), None)
+            entity_id = self._entity_id_map.get(id(entity_value))
+            if entity_id is not None:
+                self._delete_entity_buffer.append(entity_id)
 
     def delete_buffer_purge(self):
-        """Delete all entities from delete buffer"""
-        for delete_entity in self._delete_entity_buffer:
+        """
+        Delete all entities from delete buffer
+        Entity may be marked for deletion more than 1 time
+        """
+        if self._delete_entity_buffer:
             try:
-                self.delete(delete_entity)
-            except ValueError:
-                # the object has been marked for deletion more than 1 time.
-                pass
-        self._delete_entity_buffer.clear()
+                self._delete_batch([self.get(i) for i in self._delete_entity_buffer if self.is_alive(i)])
+            finally:
+                self._delete_entity_buffer.clear()
 
-    def init(self, *entity_list: Any):
+    def buffer_add(self, *entity_value_list: Any):
+        """Save entities into add buffer for add them to world at buffer_apply"""
+        for entity_value in entity_value_list:
+            self._add_entity_buffer[id(entity_value)] = entity_value
+
+    def buffer_delete(self, *entity_value_list: Any):
+        """Save entities into delete buffer for delete them from world at buffer_apply, same as delete_buffer_add"""
+        self.delete_buffer_add(*entity_value_list)
+
+    def buffer_clear(self, *entity_class_val_list: type):
         """
-        Let entity manager to "know" about entities before work
-        If manager do not know about entity, it will raise KeyError on access to it.
+        Save entity classes into clear buffer for delete all their entities at buffer_apply
+        Entities of these classes that wait in add buffer are removed from it
+        """
+        if self._add_entity_buffer:
+            entity_class_val_set = set(entity_class_val_list)
+            for entity_id, entity_value in list(self._add_entity_buffer.items()):
+                if entity_value.__class__ in entity_class_val_set:
+                    del self._add_entity_buffer[entity_id]
+        self._clear_class_buffer.extend(entity_class_val_list)
+
+    def buffer_apply(self):
+        """
+        Apply buffered changes at once: clear classes, delete entities, add entities
+        Result is the same as of changes in order of recording: delete or clear cancels previous buffered add
+        Use buffers to change world while iterating over entities
+        Buffers are empty after call, even on error
+        """
+        try:
+            if self._clear_class_buffer:
+                for entity_class_val in dict.fromkeys(self._clear_class_buffer):
+                    self._clear(entity_class_val)
+            self.delete_buffer_purge()
+            if self._add_entity_buffer:
+                self.add(*self._add_entity_buffer.values())
+        finally:
+            self._clear_class_buffer.clear()
+            self._delete_entity_buffer.clear()
+            self._add_entity_buffer.clear()
+
+    def delete_where(self, query_or_class: Union['Query', type], predicate: Callable[[Any], bool]) -> int:
+        """
+        Delete entities of query or entity class for which predicate is true, get deleted entities count
+        Each affected class list is rebuilt in one pass
+        entities.delete_where(Spark, lambda i: i.live_until_time < now)
+        """
+        if isinstance(query_or_class, Query):
+            entity_class_list = self._match_entity_classes(
+                query_or_class._component_class_val_list, query_or_class._without, query_or_class._any_of)
+        else:
+            entity_class_list = (query_or_class,)
+        if self._tombstone_map:
+            self._compact()
+        deleted_cnt = 0
+        for entity_class in entity_class_list:
+            entity_list = self._entity_map[entity_class]
+            delete_entity_list = list(filter(predicate, entity_list))
+            if not delete_entity_list:
+                continue
+            deleted_cnt += len(delete_entity_list)
+            if entity_class in self._column_store_map:
+                self.delete(*delete_entity_list)
+                continue
+            delete_id_set = set(map(id, delete_entity_list))
+            entity_list[:] = [i for i in entity_list if id(i) not in delete_id_set]
+            self._entity_index_map[entity_class] = {id(i): place for place, i in enumerate(entity_list)}
+            self._release_ids(delete_entity_list)
+        return deleted_cnt
+
+    def parallel_for(self, query_or_class: Union['Query', type], fn: Callable[[list], Any], chunk_size: int = 1024,
+                     workers: int = None) -> list:
+        """
+        Call fn for chunks of entities of query or entity class on shared thread pool, wait all, get fn results
+        Chunk: list with up to chunk_size entities of one entity class, chunks are processed in any order
+        workers: threads count, None - cpu count, 1 - call fn in current thread
+            Call from fn (nested) calls fn in current thread - pool threads are busy with outer chunks
+        fn must not add or delete entities directly - use buffer_add, buffer_delete, then buffer_apply after call
+        Gain: free-threaded python, numpy and other code that releases GIL
+        entities.parallel_for(Snowflake, lambda chunk: move(chunk, dt), chunk_size=4096)
+        """
+        if isinstance(query_or_class, Query):
+            chunk_list = list(query_or_class.chunks(chunk_size))
+        else:
+            if self._tombstone_map:
+                self._compact()
+            entity_list = self._entity_map[query_or_class]
+            chunk_list = [entity_list[i:i + chunk_size] for i in range(0, len(entity_list), chunk_size)]
+        workers = workers or cpu_count() or 1
+        if workers == 1 or len(chunk_list) < 2 or getattr(_worker_local, 'is_worker', False):
+            return list(map(fn, chunk_list))
+        future_list = [_worker_pool(workers).submit(fn, i) for i in chunk_list]
+        wait(future_list)
+        return [i.result() for i in future_list]
+
+    def clear(self, *entity_class_val_list: type) -> int:
+        """
+        Delete all entities of specified entity classes, get deleted entities count
+        raise KeyError for uninitialized (never added) entities
+        """
+        return sum(self._clear(entity_class_val) for entity_class_val in entity_class_val_list)
+
+    def set_expire(self, expire_at: float, *entity_value_list: Any):
+        """
+        Set time when entities should be deleted, replaces previous expiration time of entity
+        Time is any monotonic value, same as for expire - time.monotonic(), frame number
+        raise KeyError for entity that is not in world
+        """
+        for entity_value in entity_value_list:
+            entity_id = self._entity_id_map[id(entity_value)]
+            self._expire_map[entity_id] = expire_at
+            heappush(self._expire_heap, (expire_at, entity_id))
+        if len(self._expire_heap) > 2 * len(self._expire_map) + _EXPIRE_HEAP_SLACK:
+            # *drop timers of deleted entities and replaced timers
+            self._expire_heap = [i for i in self._expire_heap if self._expire_map.get(i[1]) == i[0]]
+            heapify(self._expire_heap)
+
+    def expire(self, now: float) -> int:
+        """
+        Save entities with passed expiration time (expire_at <= now) into delete buffer, get their count
+        Cost depends on count of expired entities only, delete them by delete_buffer_purge or buffer_apply
+        """
+        expire_heap = self._expire_heap
+        expired_cnt = 0
+        while expire_heap and expire_heap[0][0] <= now:
+            expire_at, entity_id = heappop(expire_heap)
+            if self._expire_map.get(entity_id) != expire_at:
+                continue  # timer was replaced
+            del self._expire_map[entity_id]
+            self._delete_entity_buffer.append(entity_id)  # *timers of deleted entities are dropped
+            expired_cnt += 1
+        return expired_cnt
+
+    def timers_pending(self) -> int:
+        """Get count of expiration timers of entities in world"""
+        return len(self._expire_map)
+
+    def _delete_batch(self, entity_value_iter: Iterable[Any]) -> int:
+        """
+        Delete entities by classes, skip entities that are not in world, get deleted entities count
+        Class list is rebuilt once in O(n+k) on many deletions or on stable_order, else O(1) swap per entity
+        """
+        class_entity_map = {}  # Person: {id(ent1): ent1}
+        for entity_value in entity_value_iter:
+            class_entity_map.setdefault(entity_value.__class__, {})[id(entity_value)] = entity_value
+        if self._tombstone_map:
+            self._compact()
+        deleted_cnt = 0
+        for entity_value_class, entity_value_map in class_entity_map.items():
+            if entity_value_class in self._column_store_map:
+                delete_entity_list = [i for i in entity_value_map.values() if hasattr(i, '_ecs_row')]
+            else:
+                entity_index = self._entity_index_map.get(entity_value_class)
+                if entity_index is None:
+                    continue  # *class is not registered, its entities are not in world
+                delete_entity_list = [i for i_id, i in entity_value_map.items() if i_id in entity_index]
+            deleted_cnt += len(delete_entity_list)
+            entity_list = self._entity_map.get(entity_value_class)
+            if entity_list is None or not self._stable_order and len(delete_entity_list) * 3 <= len(entity_list):
+                self.delete(*delete_entity_list)
+                continue
+            entity_list[:] = [i for i in entity_list if id(i) not in entity_value_map]
+            self._entity_index_map[entity_value_class] = {id(i): place for place, i in enumerate(entity_list)}
+            self._release_ids(delete_entity_list)
+        return deleted_cnt
+
+    def _clear(self, entity_class_val: type) -> int:
+        """Delete all entities of entity class, get deleted entities count"""
+        entity_list = self._entity_map[entity_class_val]
+        if self._tombstone_map:
+            self._compact()
+        if entity_class_val in self._column_store_map:
+            column_store = self._column_store_map[entity_class_val]
+            for row_proxy in entity_list:
+                column_store.detach(row_proxy)
+        else:
+            self._entity_index_map[entity_class_val] = {}
+        self._release_ids(entity_list)
+        deleted_cnt = len(entity_list)
+        entity_list.clear()
+        return deleted_cnt
+
+    def _release_ids(self, entity_value_iter: Iterable[Any]):
+        """Make ids of deleted entities invalid, save id indexes for reuse"""
+        for entity_value in entity_value_iter:
+            entity_id = self._entity_id_map.pop(id(entity_value))
+            if self._expire_map:
+                self._expire_map.pop(entity_id, None)
+            id_index = entity_id & _ID_INDEX_MASK
+            self._id_entity_list[id_index] = None
+            self._id_generation_list[id_index] += 1
+            self._id_free_list.append(id_index)
+            if self._pool_map and entity_value.__class__ in self._pool_map:
+                self._pool_map[entity_value.__class__].put(entity_value)
+
+    def spawn_many(self, prefab: Prefab, count: int, overrides: dict = None) -> list:
+        """
+        Create count entities by prefab, add them to world in bulk and get them
+        overrides: {field name: sequence or numpy array of count values} - varying fields
+        Field value: overrides, prefab defaults, entity class defaults - in that order
+        Entities of default storage are created by call of entity class, InitVar fields get values like fields
+        Columnar entity class: values are written into columns directly, __post_init__ is not called
+        raise TypeError for unknown field or field without value, ValueError for wrong length of override values
+        """
+        entity_class_val = prefab.entity_class
+        overrides = overrides or {}
+        column_store = self._column_store_map.get(entity_class_val)
+        field_list = fields(entity_class_val) if column_store else _init_fields(entity_class_val)
+        unknown_name_set = set(overrides) - {i.name for i in field_list}
+        if unknown_name_set:
+            raise TypeError('{} has no init fields {}'.format(entity_class_val.__qualname__, sorted(unknown_name_set)))
+        value_map = {}  # x: repeat(0.0, 10) or [1.0, 2.0]
+        for entity_field in field_list:
+            name = entity_field.name
+            if name in overrides:
+                values = overrides[name]
+                if len(values) != count:
+                    raise ValueError('Field {} has {} override values, expected {}'.format(name, len(values), count))
+                if column_store is None and numpy is not None and isinstance(values, numpy.ndarray):
+                    values = values.tolist()
+            elif name in prefab.defaults:
+                values = prefab.defaults[name] if column_store else repeat(prefab.defaults[name], count)
+            elif entity_field.default is not MISSING:
+                values = entity_field.default if column_store else repeat(entity_field.default, count)
+            elif entity_field.default_factory is not MISSING:
+                values = [entity_field.default_factory() for _ in range(count)]
+            else:
+                raise TypeError('No value for field {}.{}'.format(entity_class_val.__qualname__, name))
+            value_map[name] = values
+        if column_store:
+            entity_value_list = column_store.extend(count, value_map)
+        else:
+            arg_list = [value_map[i.name] for i in field_list if not i.kw_only]
+            kwarg_name_list = [i.name for i in field_list if i.kw_only]
+            if kwarg_name_list:
+                entity_value_list = [
+                    entity_class_val(*args, **dict(zip(kwarg_name_list, kwargs)))
+                    for args, kwargs in zip(zip(*arg_list) if arg_list else repeat((), count),
+                                            zip(*(value_map[i] for i in kwarg_name_list)))
+                ]
+            elif arg_list:
+                entity_value_list = list(map(entity_class_val, *arg_list))
+            else:
+                entity_value_list = [entity_class_val() for _ in range(count)]
+            try:
+                entity_list = self._entity_map[entity_class_val]
+            except KeyError:
+                self.register(entity_class_val)
+                entity_list = self._entity_map[entity_class_val]
+            self._entity_index_map[entity_class_val].update(
+                zip(map(id, entity_value_list), range(len(entity_list), len(entity_list) + count)))
+            entity_list.extend(entity_value_list)
+        # id
+        free_cnt = min(len(self._id_free_list), count)
+        for entity_value in entity_value_list[:free_cnt]:
+            id_index = self._id_free_list.popleft()
+            self._id_entity_list[id_index] = entity_value
+            self._entity_id_map[id(entity_value)] = self._id_generation_list[id_index] << _ID_INDEX_BITS | id_index
+        id_index = len(self._id_entity_list)
+        new_entity_value_list = entity_value_list[free_cnt:]
+        self._id_entity_list.extend(new_entity_value_list)
+        self._id_generation_list.extend(repeat(0, len(new_entity_value_list)))
+        self._entity_id_map.update(zip(map(id, new_entity_value_list), range(id_index, len(self._id_entity_list))))
+        return entity_value_list
+
+    def set_pool(self, entity_class_val: type, max_size: int):
+        """
+        Enable pool of deleted entities for entity class, spawn reuses them instead of creating new ones
+        max_size: max count of entities in pool, 0 - disable pool
+        Do not keep references to deleted entities of pooled class - they will be reused
+        raise ValueError for columnar entity class
+        """
+        if entity_class_val in self._column_store_map:
+            raise ValueError('Pool is not supported for columnar entity class {}'.format(entity_class_val.__qualname__))
+        if max_size:
+            self._pool_map.setdefault(entity_class_val, _EntityPool()).max_size = max_size
+        else:
+            self._pool_map.pop(entity_class_val, None)
+
+    def spawn(self, entity_class_val: type, *args, **kwargs) -> Any:
+        """
+        Add entity to world and get it: take entity from pool and run its __init__ with given args, or create new one
+        Works as add(entity_class_val(*args, **kwargs)) for entity class without pool
+        Row proxy is returned for columnar entity class
+        """
+        entity_pool = self._pool_map.get(entity_class_val)
+        if entity_pool is not None and entity_pool.free_map:
+            entity_value = entity_pool.free_map.popitem()[1]
+            entity_class_val.__init__(entity_value, *args, **kwargs)
+            entity_pool.hits += 1
+        else:
+            entity_value = entity_class_val(*args, **kwargs)
+            if entity_pool is not None:
+                entity_pool.misses += 1
+        self.add(entity_value)
+        if entity_class_val in self._column_store_map:
+            return self._column_store_map[entity_class_val].entity_list[-1]
+        return entity_value
+
+    def pool_info(self, entity_class_val: type) -> PoolInfo:
+        """
+        Get pool statistics of entity class: size, max_size, hits, misses, high_water - max size reached
+        raise KeyError for entity class without pool
+        """
+        entity_pool = self._pool_map[entity_class_val]
+        return PoolInfo(len(entity_pool.free_map), entity_pool.max_size, entity_pool.hits, entity_pool.misses,
+                        entity_pool.high_water)
+
+    def register(self, *entity_class_val_list: type, columnar: bool = False):
+        """
+        Let entity manager to "know" about entity classes before work, without creating entities
+        If manager do not know about entity class, it will raise KeyError on access to it.
         event: SomeEvent = next(self.entities.get_by_class(SomeEvent), None)
+        columnar: store entities in numpy arrays - field per array, all fields must be int, float or bool
+            numpy is required, entities in world are row proxies, order is not stable on delete
+            register class before adding its entities
+        raise ValueError for already registered class with other storage type, for columnar class with pool
+        """
+        for entity_class_val in entity_class_val_list:
+            if entity_class_val in self._entity_map:
+                if columnar != (entity_class_val in self._column_store_map):
+                    raise ValueError('Entity class {} is already registered with other storage type'.format(
+                        entity_class_val.__qualname__))
+                continue
+            if columnar:
+                if entity_class_val in self._pool_map:
+                    raise ValueError('Pool is not supported for columnar entity class {}'.format(
+                        entity_class_val.__qualname__))
+                column_store = _ColumnStore(entity_class_val)
+                self._column_store_map[entity_class_val] = column_store
+                self._column_store_map[column_store.row_class] = column_store
+                self._entity_map[entity_class_val] = column_store.entity_list
+            else:
+                self._entity_map[entity_class_val] = []
+            self._entity_index_map[entity_class_val] = {}
+            entity_mask = 0
+            for component_class in entity_class_val.__mro__:
+                if component_class is object:
+                    continue
+                if component_class not in self._component_bit_map:
+                    self._component_bit_map[component_class] = 1 << len(self._component_bit_map)
+                    self._component_entity_map[component_class] = []
+                entity_mask |= self._component_bit_map[component_class]
+                self._component_entity_map[component_class].append(entity_class_val)
+            self._entity_mask_map[entity_class_val] = entity_mask
+            self._plan_version += 1
+            self._query_plan_map.clear()
+            self._column_plan_map.clear()
+
+    def init(self, *entity_list: Any):
         """
-        for ent in entity_list:
-            self.add(ent)
-            self.delete(ent)
+        Let entity manager to "know" about entities before work - registers classes of given entities
+        Use EntityManager.register to avoid creating entities
+        """
+        self.register(*(ent.__class__ for ent in entity_list))
+
+    def set_resource(self, *resource_list: Any):
+        """
+        Save singletons by their classes, replace previous ones
+        Resources are not entities: they have no ids and are not returned by queries
+        """
+        for resource_value in resource_list:
+            self._resource_map[resource_value.__class__] = resource_value
+
+    def resource(self, resource_class: type) -> Any:
+        """
+        Get singleton by its class - O(1)
+        raise ResourceNotFoundError if resource is not set
+        """
+        try:
+            return self._resource_map[resource_class]
+        except KeyError:
+            raise ResourceNotFoundError(resource_class) from None
+
+    def delete_resource(self, *resource_class_list: type):
+        """
+        Delete singletons by their classes
+        raise ResourceNotFoundError if resource is not set
+        """
+        for resource_class in resource_class_list:
+            try:
+                del self._resource_map[resource_class]
+            except KeyError:
+                raise ResourceNotFoundError(resource_class) from None
+
+    def emit(self, *event_list: Any):
+        """
+        Send events to readers of their classes, see event_reader
+        Events are not entities: they are not stored in world and live until the second events_update call
+        """
+        event_channel_map = self._event_channel_map
+        for event_value in event_list:
+            try:
+                event_channel_map[event_value.__class__].event_list.append(event_value)
+            except KeyError:
+                event_channel = event_channel_map[event_value.__class__] = _EventChannel()
+                event_channel.event_list.append(event_value)
+
+    def event_reader(self, event_class: type) -> 'EventReader':
+        """Get new reader of events of the class, it reads each event once, create it once - at System.start"""
+        try:
+            event_channel = self._event_channel_map[event_class]
+        except KeyError:
+            event_channel = self._event_channel_map[event_class] = _EventChannel()
+        return EventReader(event_channel)
+
+    def events_update(self):
+        """
+        Drop events sent before the previous call, call once per frame
+        Any system reads event in the frame of emission or in the next frame, regardless of systems order
+        """
+        for event_channel in self._event_channel_map.values():
+            event_channel.update()
 
     def get_by_class(self, *entity_class_val_list: type) -> Iterator[Any]:
         """
         Get all entities by specified entity classes in specified order
         raise KeyError for uninitialized (never added) entities
         """
+        if self._tombstone_map:
+            self._compact()
         for entity_class_val in entity_class_val_list:
             yield from self._entity_map[entity_class_val]
 
-    def get_with_component(self, *component_class_val_list: type) -> Iterator[Any]:
+    def get_with_component(self, *component_class_val_list: type, without: Tuple[type, ...] = (),
+                           any_of: Tuple[type, ...] = ()) -> Iterator[Any]:
         """
         Get all entities that contains all specified component classes
+        without: skip entities that contains any of these component classes
+        any_of: get only entities that contains at least one of these component classes
+        Matched entity lists are cached per query (query plan), cache resets on new entity class
         Sometimes it will be useful to warm up the cache
-        raise KeyError for uninitialized (never added) entities
         """
-        component_class_val_set = \
-            self._set_cache_map.setdefault(component_class_val_list, set(component_class_val_list))
-        for entity_class, entity_component_set in self._entity_components_map.items():
-            if component_class_val_set.issubset(entity_component_set):
-                yield from self._entity_map[entity_class]
+        if self._tombstone_map:
+            self._compact()
+        query_key = (component_class_val_list, without, any_of) if without or any_of else component_class_val_list
+        try:
+            entity_list_tuple = self._query_plan_map[query_key]
+            self._query_cache_hits += 1
+        except KeyError:
+            entity_list_tuple = self._query_plan_map[query_key] = \
+                self._query_plan(component_class_val_list, without, any_of)
+            self._query_cache_misses += 1
+        for entity_list in entity_list_tuple:
+            yield from entity_list
+
+    def get_changed(self, component_class_val: type, since: int) -> Iterator[Any]:
+        """
+        Get entities that contains the component with track_changes, which fields were set after change tick "since"
+        since: System.last_run_tick in System.update - changes after the previous update of the system
+        Entities are changed at creation. Cost - O(entities with component)
+        raise ValueError for component without track_changes
+        """
+        try:
+            tick_name = _tracked_component_map[component_class_val]
+        except KeyError:
+            raise ValueError('Component {} has no track_changes'.format(component_class_val.__qualname__)) from None
+        for entity_value in self.get_with_component(component_class_val):
+            if getattr(entity_value, tick_name, 0) > since:  # *0 - no fields were set
+                yield entity_value
+
+    @staticmethod
+    def change_tick() -> int:
+        """Get current change tick, for get_changed outside of systems"""
+        return _ChangeClock.tick
+
+    def _query_plan(self, component_class_val_list: Tuple[type, ...], without: Tuple[type, ...] = (),
+                    any_of: Tuple[type, ...] = ()) -> Tuple[list, ...]:
+        """Get tuple of entity lists for entity classes that matches query, see get_with_component"""
+        return tuple(
+            self._entity_map[entity_class]
+            for entity_class in self._match_entity_classes(component_class_val_list, without, any_of)
+        )
+
+    def _match_entity_classes(self, component_class_val_list: Tuple[type, ...], without: Tuple[type, ...] = (),
+                              any_of: Tuple[type, ...] = ()) -> list:
+        """
+        Get entity classes that matches query, in registration order, see get_with_component
+        Candidates are taken from the smallest component index list, rest of conditions are checked by masks
+        """
+        component_bit_map = self._component_bit_map
+        required_mask = 0
+        candidate_list = self._entity_mask_map
+        for component_class in component_class_val_list:
+            if component_class not in component_bit_map:
+                return []
+            required_mask |= component_bit_map[component_class]
+            component_entity_list = self._component_entity_map[component_class]
+            if len(component_entity_list) < len(candidate_list):
+                candidate_list = component_entity_list
+        without_mask = 0
+        for component_class in without:
+            without_mask |= component_bit_map.get(component_class, 0)
+        any_of_mask = 0
+        for component_class in any_of:
+            any_of_mask |= component_bit_map.get(component_class, 0)
+        if any_of and not any_of_mask:
+            return []
+        entity_mask_map = self._entity_mask_map
+        return [
+            entity_class
+            for entity_class in candidate_list
+            if entity_mask_map[entity_class] & required_mask == required_mask
+            and not entity_mask_map[entity_class] & without_mask
+            and (not any_of_mask or entity_mask_map[entity_class] & any_of_mask)
+        ]
+
+    def query(self, *component_class_val_list: type, without: Tuple[type, ...] = (),
+              any_of: Tuple[type, ...] = ()) -> 'Query':
+        """
+        Get reusable query of entities, args are like at get_with_component
+        Create it once (at System.start) and use every frame - iter, len, first, single, chunks
+        """
+        return Query(self, component_class_val_list, without, any_of)
+
+    def get_columns(self, *component_class_val_list: type) -> Iterator[dict]:
+        """
+        Get numpy views of fields for each columnar entity class that contains all specified component classes
+        {'x': array([1., 2.]), 'y': array([3., 4.])} - change views in place, views are valid until add/delete
+        Entity classes with default storage are skipped
+        """
+        try:
+            column_store_tuple = self._column_plan_map[component_class_val_list]
+        except KeyError:
+            column_store_tuple = self._column_plan_map[component_class_val_list] = tuple(
+                self._column_store_map[entity_class]
+                for entity_class in self._match_entity_classes(component_class_val_list)
+                if entity_class in self._column_store_map
+            )
+        for column_store in column_store_tuple:
+            row_cnt = len(column_store.entity_list)
+            if row_cnt:
+                yield {name: column[:row_cnt] for name, column in column_store.columns.items()}
+
+    def gather(self, field_name_list: Tuple[str, ...], *component_class_val_list: type, dtype: type = float) -> tuple:
+        """
+        Copy fields of all entities that contains all specified component classes into numpy arrays
+        x, y = entities.gather(('x', 'y'), ComPosition) - change arrays in place, then call scatter with same args
+        Arrays are reused between calls with same args, numpy is required
+        Fields annotated as int or bool of specified components get values of own type on scatter
+        """
+        key = (field_name_list, component_class_val_list, dtype)
+        try:
+            field_bridge = self._field_bridge_map[key]
+        except KeyError:
+            field_bridge = self._field_bridge_map[key] = _FieldBridge(field_name_list, dtype, {
+                i.name: i.type for component_class in component_class_val_list for i in fields(component_class)})
+        return field_bridge.gather(self.get_with_component(*component_class_val_list))
+
+    def scatter(self, field_name_list: Tuple[str, ...], *component_class_val_list: type, dtype: type = float):
+        """
+        Copy arrays of last gather with same args back into fields of gathered entities
+        Do not add or delete entities between gather and scatter
+        """
+        self._field_bridge_map[(field_name_list, component_class_val_list, dtype)].scatter()
+
+    def query_cache_info(self) -> QueryCacheInfo:
+        """Get statistics of get_with_component query plan cache: hits, misses, size"""
+        return QueryCacheInfo(self._query_cache_hits, self._query_cache_misses, len(self._query_plan_map))
+
+
+class Query:
+    """
+    Reusable query of entities that contains all specified component classes, see EntityManager.query
+    Stays valid when entities or entity classes are added and deleted
+    """
+    __slots__ = ('_entities', '_component_class_val_list', '_without', '_any_of', '_plan_version', '_entity_list_tuple')
+
+    def __init__(self, entities: EntityManager, component_class_val_list: Tuple[type, ...],
+                 without: Tuple[type, ...] = (), any_of: Tuple[type, ...] = ()):
+        self._entities = entities
+        self._component_class_val_list = component_class_val_list
+        self._without = without
+        self._any_of = any_of
+        self._plan_version = -1
+        self._entity_list_tuple = ()
+
+    def _plan(self) -> Tuple[list, ...]:
+        """Get matched entity lists, resolve them again only when a new entity class appears"""
+        entities = self._entities
+        if entities._tombstone_map:
+            entities._compact()
+        if self._plan_version != entities._plan_version:
+            self._entity_list_tuple = entities._query_plan(self._component_class_val_list, self._without, self._any_of)
+            self._plan_version = entities._plan_version
+        return self._entity_list_tuple
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(self._plan())
+
+    def __len__(self) -> int:
+        """Count of matched entities, without iteration"""
+        return sum(map(len, self._plan()))
+
+    def first(self, default: Any = None) -> Any:
+        """Get first matched entity or default"""
+        for entity_list in self._plan():
+            if entity_list:
+                return entity_list[0]
+        return default
+
+    def single(self) -> Any:
+        """
+        Get the only matched entity
+        raise ValueError if matched entities count is not 1
+        """
+        entity_cnt = len(self)
+        if entity_cnt != 1:
+            raise ValueError('Query matches {} entities, expected 1'.format(entity_cnt))
+        return self.first()
+
+    def chunks(self, size: int) -> Iterator[list]:
+        """
+        Get matched entities by lists with up to "size" entities, for batch processing
+        Chunk does not contain entities of different entity classes
+        """
+        for entity_list in self._plan():
+            for i in range(0, len(entity_list), size):
+                yield entity_list[i:i + size]
+
+
+class EventReader:
+    """Cursor of event channel, see EntityManager.event_reader"""
+    __slots__ = ('_channel', '_cursor')
+
+    def __init__(self, event_channel: _EventChannel):
+        self._channel = event_channel
+        self._cursor = event_channel.offset  # number of the next event to read
+
+    def __len__(self) -> int:
+        """Count of unread events"""
+        return self._channel.offset + len(self._channel.event_list) - max(self._cursor, self._channel.offset)
+
+    def read(self) -> list:
+        """Get unread events in order of emission, mark them as read"""
+        event_channel = self._channel
+        event_list = event_channel.event_list[max(self._cursor - event_channel.offset, 0):]
+        self._cursor = event_channel.offset + len(event_channel.event_list)
+        return event_list
+
+    def clear(self):
+        """Mark all events as read"""
+        self._cursor = self._channel.offset + len(self._channel.event_list)
 
 
 class System:
@@ -91,7 +1370,30 @@ class System:
     Abstract base class for system
     All systems must be derived from this class
     System should have data for work: implement __init__ method
+    last_run_tick: change tick of the previous update, see EntityManager.get_changed
+    reads, writes: classes of components, entities and resources that update reads and changes, for parallel run
+        Class overlaps its subclasses: entity class - its components, None - unknown, system runs alone,
+        see SystemManager(workers=)
+    fixed: update on fixed timestep ticks, see SystemManager(fixed_dt=), False - update once per frame
+    rate: update every "rate" tick (fixed tick or frame)
+    hz: update with this frequency at most, None - no limit
+    dt, tick: seconds since the previous update of the system and index of tick (fixed tick or frame) of the update,
+        set by SystemManager before update
+    priority: None - critical, updates always. Number - deferrable, updates after critical systems of the frame
+        in order of priority descending while frame budget is left, see SystemManager(frame_budget=)
+    budget_left: seconds of frame budget left before update of deferrable system - for time slicing of the work,
+        set by SystemManager
     """
+    last_run_tick = 0
+    reads: Union[Tuple[type, ...], None] = None
+    writes: Union[Tuple[type, ...], None] = None
+    fixed = False
+    rate = 1
+    hz: Union[float, None] = None
+    dt = 0.0
+    tick = 0
+    priority: Union[float, None] = None
+    budget_left = float('inf')
 
     def start(self):
         """
@@ -116,29 +1418,295 @@ class System:
     stop._implemented = False
 
 
+class VectorSystem(System):
+    """
+    Abstract base class for system that processes columnar entity classes by numpy
+    Set "components" - system works with columnar entity classes that contains all these components
+    Implement update_columns method
+    raise TypeError on definition of subclass without update_columns and update
+    """
+    components = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not getattr(cls.update_columns, '_implemented', True) and cls.update is VectorSystem.update:
+            raise TypeError('VectorSystem {} must implement update_columns'.format(cls.__qualname__))
+
+    def __init__(self, entities: EntityManager):
+        self.entities = entities
+
+    def update(self):
+        """Run update_columns for each columnar entity class with specified components"""
+        for columns in self.entities.get_columns(*self.components):
+            self.update_columns(columns)
+
+    def update_columns(self, columns: dict):
+        """
+        Run main system logic for columns of one entity class
+        columns: numpy views of fields - {'x': array([1., 2.]), 'speed_x': array([.5, .5])}, change them in place
+        """
+
+    update_columns._implemented = False
+
+
+def _is_classes_overlap(class_iter1: Iterable[type], class_iter2: Iterable[type]) -> bool:
+    """Check that classes overlap: same class or subclass - entity class and its component"""
+    class_list2 = tuple(class_iter2)
+    return any(issubclass(i, j) or issubclass(j, i) for i in class_iter1 for j in class_list2)
+
+
+def _is_systems_conflict(system1: System, system2: System) -> bool:
+    """Check that systems can not be updated at the same time: one writes what another one reads or writes"""
+    if system1.reads is None or system1.writes is None or system2.reads is None or system2.writes is None:
+        return True
+    return _is_classes_overlap(system1.writes, chain(system2.reads, system2.writes)) or \
+        _is_classes_overlap(system2.writes, system1.reads)
+
+
 class SystemManager:
     """System manager"""
 
-    def __init__(self, system_list: Iterable[System]):
+    def __init__(self, system_list: Iterable[System], workers: int = 0, fixed_dt: float = None,
+                 max_fixed_steps: int = 5, frame_budget: float = None, max_deferred_frames: int = 10):
         """
         system_list: Ordered sequence with systems
+        workers: threads count for parallel update of systems by stages, 0 - update systems one by one in given order
+            Stage contains systems without conflicts by System.reads and System.writes,
+            system runs after all preceding systems that conflict with it
+            Systems of one stage must not add or delete entities directly - use EntityManager.buffer_* methods
+        fixed_dt: fixed timestep in seconds for systems with System.fixed, None - fixed systems are updated per frame
+            Frame time from update_systems(dt) is accumulated, fixed systems are updated 0..N times per frame
+            Fixed ticks run at list position of the first fixed system, fixed systems keep their order between them
+        max_fixed_steps: max fixed ticks per frame, the rest of accumulated time is dropped - against slowdown spiral
+        frame_budget: seconds per update_systems call, None - no limit
+            Deferrable systems (System.priority is not None) are deferred when update of the system will exceed budget,
+            priority of deferred system grows by 1 per deferred frame
+        max_deferred_frames: deferrable system deferred this count of frames in a row updates regardless of budget
         """
         self._system_list = tuple(system_list)
         self._system_with_start_list = tuple(i for i in self._system_list if getattr(i.start, '_implemented', True))
         self._system_with_update_list = tuple(i for i in self._system_list if getattr(i.update, '_implemented', True))
         self._system_with_stop_list = tuple(i for i in self._system_list if getattr(i.stop, '_implemented', True))
+        self.frame = 0  # count of update_systems calls
+        self.fixed_tick = 0  # count of fixed timestep ticks
+        self.alpha = 0.0  # accumulated time / fixed_dt - for interpolation of drawing between fixed ticks
+        self.executed_cnt = 0  # system updates in the last frame
+        self.skipped_cnt = 0  # systems skipped in the last frame: disabled, by run condition, rate, hz, budget
+        self.deferred_cnt = 0  # deferrable systems skipped by budget in the last frame
+        self.budget_used = 0.0  # seconds of the last update_systems call
+        self.frame_budget = frame_budget
+        self._workers = workers
+        self._executor = None
+        self._fixed_dt = fixed_dt
+        self._max_fixed_steps = max_fixed_steps
+        self._accumulator = 0.0
+        self._max_deferred_frames = max_deferred_frames
+        self._deferred_frames_map = {}  # id(system): frames in a row deferred by budget
+        self._cost_map = {}  # id(system): seconds of the last update of deferrable system
+        self._system_elapsed_map = {id(i): 0.0 for i in self._system_with_update_list}  # id(system): seconds
+        self._run_condition_map = {}  # id(system): predicate
+        self._disabled_id_set = set()  # id(system)
+        self._plan_is_actual = False
+        self.stages = ()
+        self._pre_fixed_plan = ()
+        self._fixed_plan = ()
+        self._frame_plan = ()
+        self._deferrable_list = ()
+        for system in self._system_with_update_list:
+            if system.priority is not None and fixed_dt and system.fixed:
+                raise ValueError('System {} can not be both fixed and deferrable'.format(system))
+        self._build_plan()
+
+    def _build_plan(self):
+        """Build stages and update plans of enabled systems"""
+        enabled_list = tuple(i for i in self._system_with_update_list if id(i) not in self._disabled_id_set)
+        fixed_list = tuple(i for i in enabled_list if self._fixed_dt and i.fixed)
+        self._deferrable_list = tuple(i for i in enabled_list if i.priority is not None)
+        # *frame systems before the first fixed system in list are updated before fixed ticks
+        fixed_pos = enabled_list.index(fixed_list[0]) if fixed_list else len(enabled_list)
+        pre_fixed_list = tuple(i for i in enabled_list[:fixed_pos] if i.priority is None)
+        frame_list = tuple(i for i in enabled_list[fixed_pos:] if i not in fixed_list and i.priority is None)
+        pre_fixed_stages = self._build_stages(pre_fixed_list)
+        fixed_stages = self._build_stages(fixed_list)
+        frame_stages = self._build_stages(frame_list)
+        self.stages = pre_fixed_stages + fixed_stages + frame_stages if self._workers else ()
+        # (stage, system of stage if it is the only one without rate, hz and run condition - updated directly)
+        self._pre_fixed_plan = tuple((i, self._single_system(i)) for i in pre_fixed_stages)
+        self._fixed_plan = tuple((i, self._single_system(i)) for i in fixed_stages)
+        self._frame_plan = tuple((i, self._single_system(i)) for i in frame_stages)
+        self._plan_is_actual = True
+
+    def _single_system(self, stage: Tuple[System, ...]) -> Union[System, None]:
+        """Get the only system of stage if it runs on each tick, rate and hz are read once"""
+        if len(stage) == 1 and stage[0].rate == 1 and not stage[0].hz and id(stage[0]) not in self._run_condition_map:
+            return stage[0]
+        return None
+
+    def _build_stages(self, system_list: Tuple[System, ...]) -> Tuple[Tuple[System, ...], ...]:
+        """
+        Group systems into stages: stage of system is next after stages of conflicting systems
+        Stage per system in given order for sequential update
+        """
+        if not self._workers:
+            return tuple((i,) for i in system_list)
+        stage_list = []
+        system_stage_list = []  # (system, stage number)
+        for system in system_list:
+            stage_num = 1 + max((n for i, n in system_stage_list if _is_systems_conflict(i, system)), default=-1)
+            if stage_num == len(stage_list):
+                stage_list.append([])
+            stage_list[stage_num].append(system)
+            system_stage_list.append((system, stage_num))
+        return tuple(map(tuple, stage_list))
+
+    def enable(self, *system_list: System):
+        """Enable updates of disabled systems, O(1) - update plan is rebuilt on the next update_systems"""
+        for system in system_list:
+            if id(system) in self._disabled_id_set:
+                self._disabled_id_set.discard(id(system))
+                self._plan_is_actual = False
+
+    def disable(self, *system_list: System):
+        """Disable updates of systems, disabled system costs nothing, O(1) - plan is rebuilt lazily"""
+        for system in system_list:
+            if id(system) not in self._system_elapsed_map:
+                raise ValueError('System {} is not in SystemManager or has no update'.format(system))
+            if id(system) not in self._disabled_id_set:
+                self._disabled_id_set.add(id(system))
+                self._plan_is_actual = False
+
+    def is_enabled(self, system: System) -> bool:
+        """Check that system updates are not disabled"""
+        return id(system) not in self._disabled_id_set
+
+    def set_run_condition(self, system: System, predicate: Union[Callable[[], bool], None]):
+        """
+        Update system only when predicate() is true, predicate is called before each update of the system
+        predicate: None - remove run condition
+        """
+        if id(system) not in self._system_elapsed_map:
+            raise ValueError('System {} is not in SystemManager or has no update'.format(system))
+        if predicate is None:
+            self._run_condition_map.pop(id(system), None)
+        else:
+            self._run_condition_map[id(system)] = predicate
+        self._plan_is_actual = False
 
     def start_systems(self):
         """Start all systems"""
         for system in self._system_with_start_list:
             system.start()
 
-    def update_systems(self):
-        """Update all systems"""
-        for system in self._system_with_update_list:
+    def update_systems(self, dt: float = 0.0):
+        """
+        Update all systems, each system update gets new change tick
+        dt: seconds since the previous call, for fixed timestep and System.dt, System.hz
+        """
+        frame_start = perf_counter()
+        if not self._plan_is_actual:
+            self._build_plan()
+        self.frame += 1
+        self.executed_cnt = 0
+        self.skipped_cnt = len(self._disabled_id_set)
+        if self._pre_fixed_plan:
+            self._update_stages(self._pre_fixed_plan, self.frame, dt)
+        if self._fixed_dt:
+            self._accumulator += dt
+            fixed_step_cnt = 0
+            while self._accumulator >= self._fixed_dt:
+                if fixed_step_cnt == self._max_fixed_steps:
+                    self._accumulator %= self._fixed_dt
+                    break
+                self._accumulator -= self._fixed_dt
+                self.fixed_tick += 1
+                fixed_step_cnt += 1
+                self._update_stages(self._fixed_plan, self.fixed_tick, self._fixed_dt)
+            self.alpha = self._accumulator / self._fixed_dt
+        self._update_stages(self._frame_plan, self.frame, dt)
+        self.deferred_cnt = 0
+        if self._deferrable_list:
+            self._update_deferrable(frame_start, dt)
+        _ChangeClock.tick += 1  # *for changes between frames
+        self.budget_used = perf_counter() - frame_start
+
+    def _update_stages(self, plan: tuple, tick: int, dt: float):
+        """Update systems by stages, systems of stage are updated in parallel and get the same change tick"""
+        system_elapsed_map = self._system_elapsed_map
+        run_condition_map = self._run_condition_map
+        for stage, single_system in plan:
+            if single_system is not None:
+                single_system.dt = dt
+                single_system.tick = tick
+                _ChangeClock.tick += 1
+                single_system.update()
+                single_system.last_run_tick = _ChangeClock.tick
+                self.executed_cnt += 1
+                continue
+            due_system_list = []
+            for system in stage:
+                elapsed = system_elapsed_map[id(system)] = system_elapsed_map[id(system)] + dt
+                if tick % system.rate or system.hz and elapsed < 1 / system.hz or \
+                        id(system) in run_condition_map and not run_condition_map[id(system)]():
+                    self.skipped_cnt += 1
+                    continue
+                system.dt = elapsed
+                system.tick = tick
+                system_elapsed_map[id(system)] = 0.0
+                due_system_list.append(system)
+            if not due_system_list:
+                continue
+            _ChangeClock.tick += 1
+            if len(due_system_list) == 1:
+                due_system_list[0].update()
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix='ecs_system')
+                future_list = [self._executor.submit(i.update) for i in due_system_list]
+                wait(future_list)
+                for future in future_list:
+                    future.result()  # *raise exception of system
+            for system in due_system_list:
+                system.last_run_tick = _ChangeClock.tick
+            self.executed_cnt += len(due_system_list)
+
+    def _update_deferrable(self, frame_start: float, dt: float):
+        """Update deferrable systems by priority while frame budget is left, last update time is cost estimate"""
+        system_elapsed_map = self._system_elapsed_map
+        run_condition_map = self._run_condition_map
+        deferred_frames_map = self._deferred_frames_map
+        cost_map = self._cost_map
+        frame_budget = self.frame_budget
+        for system in sorted(self._deferrable_list, reverse=True,
+                             key=lambda i: i.priority + deferred_frames_map.get(id(i), 0)):
+            elapsed = system_elapsed_map[id(system)] = system_elapsed_map[id(system)] + dt
+            if self.frame % system.rate or system.hz and elapsed < 1 / system.hz or \
+                    id(system) in run_condition_map and not run_condition_map[id(system)]():
+                self.skipped_cnt += 1
+                continue
+            start = perf_counter()
+            if frame_budget is not None:
+                budget_left = frame_budget - (start - frame_start)
+                deferred_frames = deferred_frames_map.get(id(system), 0)
+                if budget_left < cost_map.get(id(system), 0.0) and deferred_frames < self._max_deferred_frames:
+                    deferred_frames_map[id(system)] = deferred_frames + 1
+                    self.deferred_cnt += 1
+                    self.skipped_cnt += 1
+                    continue
+                system.budget_left = budget_left
+            deferred_frames_map[id(system)] = 0
+            system.dt = elapsed
+            system.tick = self.frame
+            system_elapsed_map[id(system)] = 0.0
+            _ChangeClock.tick += 1
             system.update()
+            system.last_run_tick = _ChangeClock.tick
+            cost_map[id(system)] = perf_counter() - start
+            self.executed_cnt += 1
 
     def stop_systems(self):
         """Stop all systems"""
         for system in self._system_with_stop_list:
             system.stop()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
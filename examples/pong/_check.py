@@ -1,7 +1,7 @@
 import time
 import pygame
 
-from ecs_pattern import EntityManager
+from ecs_pattern import entity, EntityManager
 
 from entities import Ball, GameStateInfo, Racket, Score, Table, TeamScoredGoalEvent, WaitForBallMoveEvent
 from sprites import ball_sprite, racket_sprite, table_sprite, score_sprite
@@ -262,6 +262,84 @@ def entity_manager_delete_buffer():
     print(time.time() - t, 'sec')
 
 
+def entity_manager_delete_time():
+    """
+    Delete all Ball entities through delete buffer, in insertion order
+
+    list.remove (1.4.0)
+        100_000 - 0.6519858837127686 sec
+        1_000_000 - 122.33910059928894 sec
+    stable_order=False - swap with last
+        100_000 - 0.042676448822021484 sec
+        1_000_000 - 0.4949781894683838 sec
+    stable_order=True - tombstones + compaction
+        100_000 - 0.0441586971282959 sec
+        1_000_000 - 0.501824140548706 sec
+    """
+    for stable_order in (False, True):
+        for entities_cnt in (100_000, 1_000_000):
+            entities = EntityManager(stable_order=stable_order)
+            entities.add(*(Ball(sprite=ball_spr, x=0, y=0, speed_x=0, speed_y=0) for _ in range(entities_cnt)))
+            t = time.time()
+            for ent in entities.get_by_class(Ball):
+                entities.delete_buffer_add(ent)
+            entities.delete_buffer_purge()
+            next(entities.get_by_class(Ball), None)  # *compaction for stable_order
+            print('stable_order={} {}'.format(stable_order, entities_cnt), time.time() - t, 'sec')
+
+
+def event_throughput():
+    """
+    Send and read TeamScoredGoalEvent, 10 frames
+
+    event entities: add, get_by_class, delete
+        1_000 - 0.006645917892456055 sec
+        100_000 - 0.824730634689331 sec
+    event channel: emit, EventReader.read, events_update
+        1_000 - 0.00032830238342285156 sec
+        100_000 - 0.038201093673706055 sec
+    """
+    for events_cnt in (1_000, 100_000):
+        event_list = [TeamScoredGoalEvent(Team.LEFT) for _ in range(events_cnt)]
+
+        entities = EntityManager()
+        entities.register(TeamScoredGoalEvent)
+        t = time.time()
+        for _ in range(10):
+            entities.add(*event_list)
+            for event in entities.get_by_class(TeamScoredGoalEvent):
+                entities.delete_buffer_add(event)
+            entities.delete_buffer_purge()
+        print('event entities', events_cnt, time.time() - t, 'sec')
+
+        entities = EntityManager()
+        event_reader = entities.event_reader(TeamScoredGoalEvent)
+        t = time.time()
+        for _ in range(10):
+            entities.emit(*event_list)
+            for _event in event_reader.read():
+                pass
+            entities.events_update()
+        print('event channel', events_cnt, time.time() - t, 'sec')
+
+
+def entity_decoration_time():
+    """
+    Decorate 30 entity classes like entities.Ball1-Ball30, 100 times
+
+    @entity - dataclass code generation
+        0.7555112838745117 sec
+    @entity(fast_init=True) - code cached by field layout
+        0.22643613815307617 sec
+    """
+    for fast_init in (False, True):
+        t = time.time()
+        for _ in range(100):
+            for i in range(30):
+                entity(type('Ball{}'.format(i), (ComMotion, ComVisible), {'__module__': __name__}), fast_init=fast_init)
+        print('fast_init={}'.format(fast_init), time.time() - t, 'sec')
+
+
 def entity_dataclass_slots():
     """
     Checking entity dataclass slots
@@ -287,6 +365,17 @@ def entity_dataclass_slots():
         1_000_000 - Maximum memory usage for entity_dataclass_slots: 1940.67578125 Mb
         100_000 - Maximum memory usage for entity_dataclass_slots: 242.8984375 Mb
 
+    python 3.11, EntityManager with delete index (id -> place)
+    component = dataclass
+    entity = partial(dataclass, slots=True)
+        entity with 2 fields: 72 bytes + empty __dict__ materialised by EntityManager.add assert: 296 bytes
+        100_000 - Maximum memory usage for entity_dataclass_slots: 1416.9765625 Mb
+    component = dataclass with __slots__ = ()
+    entity = dataclass(slots=True) without __dict__ and __weakref__
+        entity with 2 fields: 48 bytes
+        100_000 - Maximum memory usage for entity_dataclass_slots: 1065.21875 Mb
+        10_000 - Maximum memory usage for entity_dataclass_slots: 167.9609375 Mb
+
     """
     entities = EntityManager()
     for i in range(1_000_000):
@@ -343,6 +432,9 @@ if __name__ == '__main__':
     # entity_manager_access_time_new()
     # show_memory_usage(entity_manager_access)
     # show_memory_usage(entity_manager_delete_buffer)
+    # entity_manager_delete_time()
+    # entity_decoration_time()
+    # event_throughput()
     # show_memory_usage(entity_dataclass_slots)
     # show_memory_usage(lib_dataclass_mem)
     # show_memory_usage(lib_attrs_mem)
@@ -35,6 +35,7 @@ def pong():
     while game_state_info.play:
         clock.tick_busy_loop(FPS_MAX)  # tick_busy_loop точный + ест проц, tick грубый + не ест проц
         system_manager.update_systems()
+        entities.events_update()
         pygame.display.flip()  # draw changes on screen
 
     system_manager.stop_systems()
@@ -28,10 +28,7 @@ class SysInit(System):
 
     def start(self):
         screen_info = pygame.display.Info()
-        self.entities.init(
-            TeamScoredGoalEvent(Team.LEFT),
-            Spark(spark_sprite(pygame.display.Info()), 0, 0, 0, 0)
-        )
+        self.entities.register(Spark)
         self.entities.add(
             GameStateInfo(
                 play=True,
@@ -125,10 +122,8 @@ class SysMovement(System):
         # goal
         if ball.x < table.x or ball.x > table.sprite.rect.width - ball.sprite.rect.width:
             team_scored_goal = Team.RIGHT if ball.x < table.x else Team.LEFT
-            self.entities.add(
-                TeamScoredGoalEvent(team_scored_goal),
-                WaitForBallMoveEvent(1000)
-            )
+            self.entities.emit(TeamScoredGoalEvent(team_scored_goal))
+            self.entities.add(WaitForBallMoveEvent(1000))
             screen_info = pygame.display.Info()
             min_speed = int(BALL_SPEED_MIN * screen_info.current_h)
             for i in range(40):
@@ -157,16 +152,19 @@ class SysMovement(System):
 class SysGoal(System):
     def __init__(self, entities: EntityManager):
         self.entities = entities
+        self.team_scored_goal_events = None
+
+    def start(self):
+        self.team_scored_goal_events = self.entities.event_reader(TeamScoredGoalEvent)
 
     def update(self):
-        team_scored_goal_event: TeamScoredGoalEvent = next(self.entities.get_by_class(TeamScoredGoalEvent), None)
-        if team_scored_goal_event:
+        team_scored_goal_event: TeamScoredGoalEvent
+        for team_scored_goal_event in self.team_scored_goal_events.read():
             score_entity: Score
             for score_entity in self.entities.get_by_class(Score):
                 if score_entity.team == team_scored_goal_event.team:
                     score_entity.score += 1
                     score_entity.sprite = score_sprite(score_entity.score)
-            self.entities.delete(team_scored_goal_event)
 
 
 class SysRoundStarter(System):
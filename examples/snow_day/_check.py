@@ -0,0 +1,171 @@
+import time
+import math
+from random import uniform
+
+import numpy
+from ecs_pattern import entity, EntityManager, Prefab, System, VectorSystem
+
+from common_tools.components import Com2dCoord, ComSpeed
+
+SCREEN_SIZE = 800
+FRAME_SIZE = 10  # snowflake frame width and height
+FPS = 60
+FRAMES_CNT = 60
+HALF_SHINE_SIZE = SCREEN_SIZE * 0.38 / 2
+SHINE_WARM_SPEED_MUL = 10
+SHINE_X = SHINE_Y = SCREEN_SIZE / 2 - HALF_SHINE_SIZE
+
+
+@entity
+class SnowflakeMotion(Com2dCoord, ComSpeed):
+    pass
+
+
+class SysMoveLoop(System):
+    """Movement and shine warming of scene1.systems.SysLive - loop over objects"""
+
+    def __init__(self, entities: EntityManager):
+        self.entities = entities
+
+    def update(self):
+        for speed_obj in self.entities.get_with_component(ComSpeed):
+            speed_obj.x += speed_obj.speed_x / FPS
+            speed_obj.y += speed_obj.speed_y / FPS
+            if speed_obj.y > SCREEN_SIZE:
+                speed_obj.x = uniform(0, SCREEN_SIZE)
+                speed_obj.y = 0 - FRAME_SIZE
+            dist_to_shine = math.dist(
+                (speed_obj.x + FRAME_SIZE, speed_obj.y + FRAME_SIZE),
+                (SHINE_X + HALF_SHINE_SIZE, SHINE_Y + HALF_SHINE_SIZE)
+            )
+            if dist_to_shine <= HALF_SHINE_SIZE:
+                speed_obj.x += speed_obj.speed_x / FPS * SHINE_WARM_SPEED_MUL * (
+                    1 if abs(speed_obj.x + FRAME_SIZE - SHINE_X + HALF_SHINE_SIZE) < HALF_SHINE_SIZE else -1
+                ) / (dist_to_shine * 0.01)
+
+
+class SysMoveVector(VectorSystem):
+    """Movement and shine warming of scene1.systems.SysLive - numpy columns"""
+    components = (Com2dCoord, ComSpeed)
+
+    def update_columns(self, columns: dict):
+        x, y, speed_x = columns['x'], columns['y'], columns['speed_x']
+        x += speed_x / FPS
+        y += columns['speed_y'] / FPS
+        fallen = y > SCREEN_SIZE
+        if fallen.any():
+            x[fallen] = numpy.random.uniform(0, SCREEN_SIZE, int(fallen.sum()))
+            y[fallen] = 0 - FRAME_SIZE
+        dist_to_shine = numpy.hypot(
+            x + FRAME_SIZE - SHINE_X - HALF_SHINE_SIZE, y + FRAME_SIZE - SHINE_Y - HALF_SHINE_SIZE)
+        warm = dist_to_shine <= HALF_SHINE_SIZE
+        direction = numpy.where(numpy.abs(x + FRAME_SIZE - SHINE_X + HALF_SHINE_SIZE) < HALF_SHINE_SIZE, 1, -1)
+        x[warm] += (speed_x / FPS * SHINE_WARM_SPEED_MUL * direction)[warm] / (dist_to_shine[warm] * 0.01)
+
+
+def snowflake_move_loop_vs_vector():
+    """
+    60 frames of snowflake movement, python 3.11, numpy 2.4
+
+    SysMoveLoop - default storage
+        10_000 - 0.1580953598022461 sec
+        100_000 - 1.5750317573547363 sec
+    SysMoveVector - columnar storage
+        10_000 - 0.02523016929626465 sec
+        100_000 - 0.19788575172424316 sec
+    """
+    for snowflake_cnt in (10_000, 100_000):
+        for system_class, columnar in ((SysMoveLoop, False), (SysMoveVector, True)):
+            entities = EntityManager()
+            entities.register(SnowflakeMotion, columnar=columnar)
+            for i in range(snowflake_cnt):
+                entities.add(SnowflakeMotion(
+                    x=uniform(0, SCREEN_SIZE),
+                    y=uniform(0, SCREEN_SIZE),
+                    speed_x=uniform(-10.0, 10.0),
+                    speed_y=uniform(15.0, 40.0),
+                ))
+            system = system_class(entities)
+            t = time.time()
+            for _ in range(FRAMES_CNT):
+                system.update()
+            print(system_class.__name__, snowflake_cnt, time.time() - t, 'sec')
+
+
+def _move_chunk(chunk: list):
+    """Movement of snowflakes chunk: python loop for fields exchange, numpy for math"""
+    x = numpy.array([i.x for i in chunk])
+    y = numpy.array([i.y for i in chunk])
+    speed_x = numpy.array([i.speed_x for i in chunk])
+    speed_y = numpy.array([i.speed_y for i in chunk])
+    for _ in range(20):  # *heavy kernel
+        x += speed_x / FPS + numpy.sin(y * 0.01) * 0.1
+        y += speed_y / FPS + numpy.cos(x * 0.01) * 0.1
+    for snowflake, new_x, new_y in zip(chunk, x.tolist(), y.tolist()):
+        snowflake.x = new_x
+        snowflake.y = new_y
+
+
+def snowflake_parallel_for():
+    """
+    60 frames of snowflake movement by EntityManager.parallel_for, 100_000 snowflakes, chunk_size=10_000
+    python 3.11 with GIL, numpy 2.4, 1 cpu machine - no cores to scale, check on multicore / free-threaded python
+
+    workers=1 - 4.693716764450073 sec
+    workers=2 - 4.826908349990845 sec
+    workers=4 - 4.838376522064209 sec
+    """
+    entities = EntityManager()
+    entities.spawn_many(Prefab(SnowflakeMotion, speed_x=1.0, speed_y=20.0), 100_000, overrides={
+        'x': [uniform(0, SCREEN_SIZE) for _ in range(100_000)],
+        'y': [uniform(0, SCREEN_SIZE) for _ in range(100_000)],
+    })
+    for workers in (1, 2, 4):
+        t = time.time()
+        for _ in range(FRAMES_CNT):
+            entities.parallel_for(SnowflakeMotion, _move_chunk, chunk_size=10_000, workers=workers)
+        print('workers={}'.format(workers), time.time() - t, 'sec')
+
+
+def snowflake_add_loop_vs_spawn_many():
+    """
+    Create snowflakes: random coordinates, same speed, python 3.11, numpy 2.4
+
+    add loop - default storage
+        10_000 - 0.008492231369018555 sec
+        100_000 - 0.10619688034057617 sec
+        1_000_000 - 1.409364938735962 sec
+    spawn_many - default storage
+        10_000 - 0.003313302993774414 sec
+        100_000 - 0.047476768493652344 sec
+        1_000_000 - 0.6935279369354248 sec
+    spawn_many - columnar storage
+        10_000 - 0.002716541290283203 sec
+        100_000 - 0.04153943061828613 sec
+        1_000_000 - 0.6459827423095703 sec
+    """
+    for snowflake_cnt in (10_000, 100_000, 1_000_000):
+        x_list = [uniform(0, SCREEN_SIZE) for _ in range(snowflake_cnt)]
+        y_list = [uniform(0, SCREEN_SIZE) for _ in range(snowflake_cnt)]
+
+        entities = EntityManager()
+        t = time.time()
+        for i in range(snowflake_cnt):
+            entities.add(SnowflakeMotion(x=x_list[i], y=y_list[i], speed_x=1.0, speed_y=20.0))
+        print('add loop', snowflake_cnt, time.time() - t, 'sec')
+
+        for columnar in (False, True):
+            entities = EntityManager()
+            entities.register(SnowflakeMotion, columnar=columnar)
+            prefab = Prefab(SnowflakeMotion, speed_x=1.0, speed_y=20.0)
+            t = time.time()
+            entities.spawn_many(prefab, snowflake_cnt, overrides={'x': x_list, 'y': y_list})
+            print('spawn_many', 'columnar' if columnar else 'default', snowflake_cnt, time.time() - t, 'sec')
+
+
+if __name__ == '__main__':
+    # snowflake_move_loop_vs_vector()
+    # snowflake_add_loop_vs_spawn_many()
+    # snowflake_parallel_for()
+
+    pass
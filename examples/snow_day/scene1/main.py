@@ -14,16 +14,16 @@ def scene1_loop(display: Surface, clock: Clock):
     system_manager = SystemManager([
         SysInit(entities),
         SysControl(entities),
-        SysLive(entities, clock),
+        SysLive(entities),
         SysDraw(entities, display, clock),
-    ])
+    ], fixed_dt=1 / FPS_MAX)
     system_manager.start_systems()
 
     info: Scene1Info = next(entities.get_by_class(Scene1Info))
 
     while info.do_play:
-        clock.tick_busy_loop(FPS_MAX)  # tick_busy_loop точный + ест проц, tick грубый + не ест проц
-        system_manager.update_systems()
+        dt_ms = clock.tick_busy_loop(FPS_MAX)  # tick_busy_loop точный + ест проц, tick грубый + не ест проц
+        system_manager.update_systems(dt_ms / 1000)
         pygame.display.flip()  # draw changes on screen
 
     system_manager.stop_systems()
@@ -8,10 +8,10 @@ from pygame import Surface, Color
 from pygame.math import Vector2
 from pygame.event import Event
 from pygame.locals import QUIT, MOUSEBUTTONDOWN, MOUSEMOTION, KEYDOWN, K_ESCAPE
-from ecs_pattern import System, EntityManager
+from ecs_pattern import System, EntityManager, Prefab
 
 from common_tools.consts import SCREEN_WIDTH, SCREEN_HEIGHT, SHINE_SIZE, SNOWFLAKE_SIZE_FROM, \
-    SNOWFLAKE_SIZE_TO, SNOWFLAKE_SIZE_CNT, FPS_MAX, SNOWFLAKE_SIZE_STEP, SNOWFLAKE_CNT, \
+    SNOWFLAKE_SIZE_TO, SNOWFLAKE_SIZE_CNT, SNOWFLAKE_SIZE_STEP, SNOWFLAKE_CNT, \
     SNOWFLAKE_ANIMATION_SPEED_MAX, SNOWFLAKE_ANIMATION_SPEED_MIN, \
     SNOWFLAKE_SPEED_X_RANGE, SNOWFLAKE_SPEED_Y_RANGE, FPS_SHOW, SHINE_WARM_SPEED_MUL
 from common_tools.components import ComAnimated, ComSpeed, Com2dCoord, ComSurface
@@ -43,20 +43,20 @@ class SysInit(System):
                 reverse=choice((True, False))
             ))
 
-        for i in range(SNOWFLAKE_CNT):
-            self.entities.add(
-                Snowflake(
-                    x=uniform(0, SCREEN_WIDTH),
-                    y=uniform(0, SCREEN_HEIGHT) - SCREEN_HEIGHT * SNOWFLAKE_SIZE_TO,
-                    speed_x=uniform(*SNOWFLAKE_SPEED_X_RANGE),
-                    speed_y=uniform(*SNOWFLAKE_SPEED_Y_RANGE),
-                    animation_set=SnowflakeAnimationSet(choice(snowflake_animation_set_collection)),
-                    animation_looped=True,
-                    animation_frame=0,
-                    animation_frame_float=0.,
-                    animation_speed=uniform(SNOWFLAKE_ANIMATION_SPEED_MIN, SNOWFLAKE_ANIMATION_SPEED_MAX),
-                ),
-            )
+        self.entities.spawn_many(
+            Prefab(Snowflake, animation_looped=True, animation_frame=0, animation_frame_float=0.),
+            SNOWFLAKE_CNT,
+            overrides=dict(
+                x=[uniform(0, SCREEN_WIDTH) for _ in range(SNOWFLAKE_CNT)],
+                y=[uniform(0, SCREEN_HEIGHT) - SCREEN_HEIGHT * SNOWFLAKE_SIZE_TO for _ in range(SNOWFLAKE_CNT)],
+                speed_x=[uniform(*SNOWFLAKE_SPEED_X_RANGE) for _ in range(SNOWFLAKE_CNT)],
+                speed_y=[uniform(*SNOWFLAKE_SPEED_Y_RANGE) for _ in range(SNOWFLAKE_CNT)],
+                animation_set=[SnowflakeAnimationSet(choice(snowflake_animation_set_collection))
+                               for _ in range(SNOWFLAKE_CNT)],
+                animation_speed=[uniform(SNOWFLAKE_ANIMATION_SPEED_MIN, SNOWFLAKE_ANIMATION_SPEED_MAX)
+                                 for _ in range(SNOWFLAKE_CNT)],
+            ),
+        )
 
         self.entities.add(
             Scene1Info(
@@ -72,10 +72,10 @@ class SysInit(System):
 
 
 class SysLive(System):
+    fixed = True  # *fixed timestep, self.dt
 
-    def __init__(self, entities: EntityManager, clock: pygame.time.Clock):
+    def __init__(self, entities: EntityManager):
         self.entities = entities
-        self.clock = clock
         self.half_shine_size = SCREEN_HEIGHT * SHINE_SIZE / 2
         self.shine = None
 
@@ -84,10 +84,10 @@ class SysLive(System):
 
     def update(self):
         # движение
-        now_fps = self.clock.get_fps() or FPS_MAX
+        dt = self.dt
         for speed_obj in self.entities.get_with_component(ComSpeed):
-            speed_obj.x += speed_obj.speed_x / now_fps
-            speed_obj.y += speed_obj.speed_y / now_fps
+            speed_obj.x += speed_obj.speed_x * dt
+            speed_obj.y += speed_obj.speed_y * dt
             if speed_obj.y > SCREEN_HEIGHT:
                 speed_obj.x = uniform(0, SCREEN_WIDTH)
                 speed_obj.y = 0 - speed_obj.animation_set.frame_h
@@ -96,7 +96,7 @@ class SysLive(System):
                 (self.shine.x + self.half_shine_size, self.shine.y + self.half_shine_size)
             )
             if dist_to_shine <= self.half_shine_size:
-                speed_obj.x += speed_obj.speed_x / now_fps * SHINE_WARM_SPEED_MUL * (
+                speed_obj.x += speed_obj.speed_x * dt * SHINE_WARM_SPEED_MUL * (
                     1 if abs(
                         speed_obj.x + speed_obj.animation_set.frame_w - self.shine.x + self.half_shine_size
                     ) < self.half_shine_size else -1
@@ -104,7 +104,7 @@ class SysLive(System):
 
         # анимация
         for ani_obj in self.entities.get_with_component(ComAnimated):
-            ani_obj.animation_frame_float -= ani_obj.animation_speed / now_fps
+            ani_obj.animation_frame_float -= ani_obj.animation_speed * dt
             ani_obj.animation_frame = ani_obj.animation_frame_float.__trunc__()  # быстрее int()
             if ani_obj.animation_frame_float < 0:
                 if ani_obj.animation_looped:
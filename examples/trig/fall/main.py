@@ -3,7 +3,7 @@ from ecs_pattern import EntityManager, SystemManager
 from pygame import Color, Surface
 from pygame.time import Clock
 
-from common_tools.consts import FPS_MAX, FPS_SHOW, SCREEN_HEIGHT_PX
+from common_tools.consts import FALL_SCENE_PAUSE, FPS_MAX, FPS_SHOW, SCREEN_HEIGHT_PX
 from common_tools.resources import FONT_DEFAULT
 from fall.entities import GameData
 from fall.systems import SysControl, SysDraw, SysInit, SysLive, SysLiveFigure
@@ -12,16 +12,20 @@ from fall.systems import SysControl, SysDraw, SysInit, SysLive, SysLiveFigure
 def game_loop(display: Surface, clock: Clock):
     """Основной цикл игры"""
     entities = EntityManager()
+    sys_live_figure = SysLiveFigure(entities)
+    sys_live = SysLive(entities, clock)
     system_manager = SystemManager([
         SysInit(entities),
         SysControl(entities),
-        SysLiveFigure(entities),
-        SysLive(entities, clock),
+        sys_live_figure,
+        sys_live,
         SysDraw(entities, display),
     ])
     system_manager.start_systems()
 
-    game_data: GameData = next(entities.get_by_class(GameData))
+    game_data: GameData = entities.resource(GameData)
+    for system in (sys_live_figure, sys_live):
+        system_manager.set_run_condition(system, lambda: game_data.scene_active != FALL_SCENE_PAUSE)
 
     while game_data.do_play:
         clock.tick_busy_loop(FPS_MAX)  # tick_busy_loop точный + ест проц, tick грубый + не ест проц
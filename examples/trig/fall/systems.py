@@ -268,7 +268,7 @@ def _surface_icon_next_figure(
 
 def _full_screen_flash(entities: EntityManager, alpha_start: int = 6, alpha_speed: int = 1):
     """Создать эффект полноэкранной вспышки"""
-    gd = next(entities.get_by_class(GameData))
+    gd = entities.resource(GameData)
     gd.full_screen_flash_alpha = alpha_start
     gd.full_screen_flash_speed = alpha_speed
 
@@ -293,18 +293,17 @@ def _spark_splash(entities: EntityManager, animation_set: ComAnimationSet,
         animation_frame = randint(220, 255)
         animation_speed = randint(300, 500)
         move_time_sec = randint(10, 40) / 100
-        entities.add(
-            Spark(
-                animation_set=animation_set,
-                animation_looped=False,
-                animation_frame=animation_frame,
-                animation_frame_float=animation_frame + 0.0,
-                animation_speed=animation_speed,
-                x=start_x + x - SPARK_SIZE_PX / 2,
-                y=start_y + y + (tri_h_fx * -1 if flip else 1) - SPARK_SIZE_PX / 2,
-                speed_x=(end_x - start_x) / move_time_sec,
-                speed_y=(end_y - start_y) / move_time_sec,
-            )
+        entities.spawn(
+            Spark,
+            animation_set=animation_set,
+            animation_looped=False,
+            animation_frame=animation_frame,
+            animation_frame_float=animation_frame + 0.0,
+            animation_speed=animation_speed,
+            x=start_x + x - SPARK_SIZE_PX / 2,
+            y=start_y + y + (tri_h_fx * -1 if flip else 1) - SPARK_SIZE_PX / 2,
+            speed_x=(end_x - start_x) / move_time_sec,
+            speed_y=(end_y - start_y) / move_time_sec,
         )
 
 
@@ -381,7 +380,7 @@ def _figure_active_to_static(gd: GameData):
 def on_click_button_save_result(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
     new_player_name = next(entities.get_by_class(InputPlayerName)).text.strip() or 'Player'
-    gd = next(entities.get_by_class(GameData))
+    gd = entities.resource(GameData)
     SETTINGS_STORAGE.player_name = new_player_name
     SETTINGS_STORAGE.records_add(gd.score, new_player_name)
     gd.do_play = False
@@ -389,12 +388,12 @@ def on_click_button_save_result(entities: EntityManager, pointer_pos: Vector2):
 
 def on_click_button_resume_game(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(GameData)).scene_active = FALL_SCENE_PLAY
+    entities.resource(GameData).scene_active = FALL_SCENE_PLAY
 
 
 def on_click_button_to_main_menu(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(GameData)).do_play = False
+    entities.resource(GameData).do_play = False
 
 
 def on_click_button_exit_game(entities: EntityManager, pointer_pos: Vector2):  # noqa
@@ -415,11 +414,8 @@ class SysInit(System):
     def start(self):
         set_sound_volume(SETTINGS_STORAGE.sound)
 
-        self.entities.init(
-            Spark([], False, 0, 0, 0, 0, 0, 0, 0),
-            TextScorePopup(surface=colored_block_surface(0, 1, 1), x=0, y=0, speed_x=0, speed_y=0, live_until_time=0),
-            TextSpeedPopup(surface=colored_block_surface(0, 1, 1), x=0, y=0, speed_x=0, speed_y=0, live_until_time=0),
-        )
+        self.entities.register(Spark, TextScorePopup, TextSpeedPopup)
+        self.entities.set_pool(Spark, 64)
         game_data = GameData(
             do_play=True,
             do_figure_fast_fall=False,
@@ -492,8 +488,8 @@ class SysInit(System):
 
         tri_coord21 = _get_tri_coord(2, 1, True)
 
+        self.entities.set_resource(game_data)
         self.entities.add(
-            game_data,
             InfoArea(
                 surface_info_area(), x=0.0, y=0.0
             ),
@@ -640,15 +636,11 @@ class SysLiveFigure(System):
     def start(self):
         self.spark_del1_animation_set = next(self.entities.get_by_class(SparkDel1AnimationSet))
         self.spark_del2_animation_set = next(self.entities.get_by_class(SparkDel2AnimationSet))
-        self.gd = next(self.entities.get_by_class(GameData))
+        self.gd = self.entities.resource(GameData)
 
     def update(self):
         now_time = monotonic()
 
-        # пауза
-        if self.gd.scene_active == FALL_SCENE_PAUSE:
-            return
-
         # конец игры
         if self.gd.scene_active == FALL_SCENE_GAME_OVER:
             return
@@ -789,20 +781,18 @@ class SysLive(System):
         self.spark_del1_animation_set = None
         self.spark_del2_animation_set = None
         self.gd = None
+        self.live_time_query = None
 
     def start(self):
         self.spark_del1_animation_set = next(self.entities.get_by_class(SparkDel1AnimationSet))
         self.spark_del2_animation_set = next(self.entities.get_by_class(SparkDel2AnimationSet))
-        self.gd = next(self.entities.get_by_class(GameData))
+        self.gd = self.entities.resource(GameData)
+        self.live_time_query = self.entities.query(ComLiveTime)
 
     def update(self):
         now_fps = self.clock.get_fps() or FPS_MAX
         now_time = monotonic()
 
-        # пауза
-        if self.gd.scene_active == FALL_SCENE_PAUSE:
-            return
-
         # движение
         for speed_obj in self.entities.get_with_component(ComSpeed):
             speed_obj.x += speed_obj.speed_x / now_fps
@@ -819,13 +809,11 @@ class SysLive(System):
                 else:
                     self.entities.delete_buffer_add(ani_obj)
 
-        # ограничение по времени жизни
-        for live_until_obj in self.entities.get_with_component(ComLiveTime):
-            if live_until_obj.live_until_time < now_time:
-                self.entities.delete_buffer_add(live_until_obj)
-
         self.entities.delete_buffer_purge()
 
+        # ограничение по времени жизни
+        self.entities.delete_where(self.live_time_query, lambda live_obj: live_obj.live_until_time < now_time)
+
 
 class SysControl(System):
 
@@ -845,7 +833,7 @@ class SysControl(System):
     def start(self):
         self.spark_del1_animation_set = next(self.entities.get_by_class(SparkDel1AnimationSet))
         self.spark_del2_animation_set = next(self.entities.get_by_class(SparkDel2AnimationSet))
-        self.gd = next(self.entities.get_by_class(GameData))
+        self.gd = self.entities.resource(GameData)
         self.switch_dir_accuracy = next(self.entities.get_by_class(TriangleActiveUp)).surface.get_width() * 0.38
 
     def update(self):
@@ -992,7 +980,7 @@ class SysDraw(System):
         self.label_pause = next(self.entities.get_by_class(LabelPause))
         self.label_game_over = next(self.entities.get_by_class(LabelGameOver))
         self.full_screen_flash = next(self.entities.get_by_class(FullScreenFlash))
-        self.gd = next(self.entities.get_by_class(GameData))
+        self.gd = self.entities.resource(GameData)
         # Поле информации об игре и Игровое поле
         for visible_entity in self.entities.get_by_class(PlayArea, InfoArea, Border):
             self._static_surface.blit(visible_entity.surface, (visible_entity.x, visible_entity.y))
@@ -26,7 +26,7 @@ def menu_loop(display: Surface, clock: Clock):
     ])
     system_manager.start_systems()
 
-    menu_data: MenuData = next(entities.get_by_class(MenuData))
+    menu_data: MenuData = entities.resource(MenuData)
 
     while menu_data.do_menu:
         clock.tick_busy_loop(FPS_MAX)  # tick_busy_loop точный + ест проц, tick грубый + не ест проц
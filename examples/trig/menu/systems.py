@@ -147,12 +147,12 @@ def _dust_spawn(entities: EntityManager):
 
 def on_click_to_menu_root(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(MenuData)).scene_active = MENU_SCENE_ROOT
+    entities.resource(MenuData).scene_active = MENU_SCENE_ROOT
 
 
 def on_click_about(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(MenuData)).scene_active = MENU_SCENE_ABOUT
+    entities.resource(MenuData).scene_active = MENU_SCENE_ABOUT
 
 
 def on_click_exit(entities: EntityManager, pointer_pos: Vector2):  # noqa
@@ -163,22 +163,22 @@ def on_click_exit(entities: EntityManager, pointer_pos: Vector2):  # noqa
 
 def on_click_guide(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(MenuData)).scene_active = MENU_SCENE_GUIDE
+    entities.resource(MenuData).scene_active = MENU_SCENE_GUIDE
 
 
 def on_click_play(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_START.play()
-    next(entities.get_by_class(MenuData)).do_menu = False
+    entities.resource(MenuData).do_menu = False
 
 
 def on_click_records(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(MenuData)).scene_active = MENU_SCENE_RECORDS
+    entities.resource(MenuData).scene_active = MENU_SCENE_RECORDS
 
 
 def on_click_settings(entities: EntityManager, pointer_pos: Vector2):  # noqa
     SOUND_BUTTON_CLICK.play()
-    next(entities.get_by_class(MenuData)).scene_active = MENU_SCENE_SETTINGS
+    entities.resource(MenuData).scene_active = MENU_SCENE_SETTINGS
 
 
 def on_click_graphic_high(entities: EntityManager, pointer_pos: Vector2):  # noqa
@@ -363,9 +363,7 @@ class SysInit(System):
             _th,
         )
 
-        self.entities.init(
-            Dust([], False, 0, 0, 0, 0, 0, 0, 0),
-        )
+        self.entities.register(Dust)
 
         _height_center_px_game_name = SCREEN_HEIGHT_PX * MENU_ROOT_AREA_GAME_NAME_HEIGHT / 2
         _height_center_px_main_buttons = SCREEN_HEIGHT_PX - SCREEN_HEIGHT_PX * MENU_ROOT_AREA_BUTTONS_HEIGHT / 2
@@ -381,13 +379,15 @@ class SysInit(System):
         normal_dist_max_val = max(normal_dist_data)
         dust_alpha_dist = [int(i * 255 / normal_dist_max_val) for i in normal_dist_data]
 
-        self.entities.add(
+        self.entities.set_resource(
             MenuData(
                 do_menu=True,
                 scene_active=MENU_SCENE_ROOT,
                 music_channel=SOUND_MENU.play(-1),
                 last_dust_spawn_time=0,
             ),
+        )
+        self.entities.add(
             Background(
                 surface_background(),
                 x=0,
@@ -559,7 +559,7 @@ class SysInit(System):
         )
 
     def stop(self):
-        next(self.entities.get_by_class(MenuData)).music_channel.stop()
+        self.entities.resource(MenuData).music_channel.stop()
 
 
 class SysLive(System):
@@ -570,7 +570,7 @@ class SysLive(System):
         self.md = None
 
     def start(self):
-        self.md = next(self.entities.get_by_class(MenuData))
+        self.md = self.entities.resource(MenuData)
 
     def update(self):
         now_fps = self.clock.get_fps() or FPS_MAX
@@ -609,7 +609,7 @@ class SysControl(System):
         self.mouse_event_set = (MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION)
 
     def start(self):
-        self.md = next(self.entities.get_by_class(MenuData))
+        self.md = self.entities.resource(MenuData)
 
     def update(self):
         for event in self.event_getter():
@@ -641,7 +641,7 @@ class SysDraw(System):
         self.label_game_name = None
 
     def start(self):
-        self.md = next(self.entities.get_by_class(MenuData))
+        self.md = self.entities.resource(MenuData)
         self.background = next(self.entities.get_by_class(Background))
         self.label_game_name = next(self.entities.get_by_class(LabelGameName))
 
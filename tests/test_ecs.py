@@ -1,7 +1,17 @@
+import copy
+import pickle
+import sys
 import unittest
+from dataclasses import InitVar, KW_ONLY
 from time import monotonic
 
-from ecs_pattern import component, entity, EntityManager, System, SystemManager
+from ecs_pattern import component, entity, EntityManager, Prefab, Query, ResourceNotFoundError, System, VectorSystem, \
+    SystemManager
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 @component
@@ -26,6 +36,53 @@ class Ball(ComPosition):
     pass
 
 
+@component
+class ComSize:
+    scale: InitVar[float] = 1.
+    w: float = 0.
+    _: KW_ONLY
+    h: float = 0.
+
+    def __post_init__(self, scale: float):
+        self.w *= scale
+        self.h *= scale
+
+
+@entity
+class SizedBall(ComPosition, ComSize):
+    pass
+
+
+@component
+class ComSpeed:
+    speed_x: float = 0.
+    speed_y: float = 0.
+
+
+@entity
+class Particle(ComPosition, ComSpeed):
+    pass
+
+
+@component(track_changes=True)
+class ComScore:
+    score: int = 0
+
+
+@entity
+class Team(ComScore, ComPerson):
+    pass
+
+
+class SysScoreView(System):
+    def __init__(self, entities: EntityManager):
+        self.entities = entities
+        self.changed_log = []
+
+    def update(self):
+        self.changed_log.append([i.name for i in self.entities.get_changed(ComScore, since=self.last_run_tick)])
+
+
 class SysGravitation(System):
     def __init__(self, entities: EntityManager):
         self.entities = entities
@@ -86,6 +143,14 @@ class SysPersonHealthRegeneration(System):
         self._regeneration_enabled = False
 
 
+class SysMove(VectorSystem):
+    components = (ComPosition, ComSpeed)
+
+    def update_columns(self, columns: dict):
+        columns['x'] += columns['speed_x'].astype(int)
+        columns['y'] += columns['speed_y'].astype(int)
+
+
 class EcsTest(unittest.TestCase):
     def test_component(self):
         position = ComPosition(1, 2)
@@ -95,6 +160,11 @@ class EcsTest(unittest.TestCase):
         self.assertEqual(person.health, 100)
         with self.assertRaises(TypeError):
             ComPerson()
+        self.assertEqual(ComPosition.__slots__, ())
+        self.assertIsInstance(position, ComPosition)
+        self.assertEqual(position, ComPosition(1, 2))
+        self.assertEqual(pickle.loads(pickle.dumps(position)), position)
+        self.assertEqual(copy.deepcopy(person), person)
 
     def test_entity(self):
         player = Player('Vladimir', 33, 3, 4)
@@ -107,6 +177,57 @@ class EcsTest(unittest.TestCase):
             @entity
             class PlayerWrongOrderSuperClass(ComPerson, ComPosition):  # noqa
                 pass
+        self.assertFalse(hasattr(player, '__dict__'))
+        with self.assertRaises(AttributeError):
+            player.speed = 1
+
+        class NotComponent:
+            speed: int = 0
+
+        with self.assertRaises(TypeError):
+            @entity
+            class PlayerWithDict(ComPosition, NotComponent):  # noqa
+                pass
+
+    def test_entity_fast_init(self):
+        @entity(fast_init=True)
+        class FastPlayer(ComPosition, ComPerson):
+            pass
+
+        player = FastPlayer('Vladimir', 33, y=4)
+        self.assertEqual(player, FastPlayer('Vladimir', 33, 0, 4))
+        self.assertNotEqual(player, Player('Vladimir', 33, 0, 4))
+        self.assertNotEqual(player, FastPlayer('Vladimir', 33, 0, 5))
+        self.assertTrue(repr(player).endswith("FastPlayer(name='Vladimir', health=33, x=0, y=4)"))
+        self.assertEqual(FastPlayer.from_tuple(('Ivan', 20, 1, 2)), FastPlayer('Ivan', 20, 1, 2))
+        self.assertIsNone(FastPlayer.__hash__)
+        self.assertFalse(hasattr(player, '__dict__'))
+        with self.assertRaises(TypeError):
+            FastPlayer()
+
+        @entity(fast_init=True)
+        class FastBall(ComPosition):
+            pass
+
+        @entity(fast_init=True)
+        class FastBall2(ComPosition):
+            pass
+
+        self.assertIs(FastBall.__init__.__code__, FastBall2.__init__.__code__)  # *same field layout
+        self.assertEqual((FastBall(1).x, FastBall2(y=2).y), (1, 2))
+        with self.assertRaises(TypeError):
+            @entity(fast_init=True)
+            class FastPlayerWrongOrderSuperClass(ComPerson, ComPosition):  # noqa
+                pass
+
+        @component
+        class ComScale:
+            scale: InitVar[float] = 1.
+
+        with self.assertRaises(TypeError):
+            @entity(fast_init=True)
+            class FastScaledBall(ComPosition, ComScale):  # noqa
+                pass
 
     def test_entitymanager(self):
         player1 = Player('Ivan', 20, 1, 2)
@@ -118,6 +239,11 @@ class EcsTest(unittest.TestCase):
             next(entities.get_by_class(Ball))
         entities.init(Ball(1, 1))
         self.assertEqual(next(entities.get_by_class(Ball), None), None)
+        with self.assertRaises(KeyError):
+            next(entities.get_by_class(Player))
+        entities.register(Player, Player)
+        self.assertEqual(next(entities.get_by_class(Player), None), None)
+        self.assertEqual(next(entities.get_with_component(ComPerson), None), None)
         entities.delete(*tuple(entities.get_by_class(Ball)))  # no balls, no raise
 
         entities.add(player1, player2, ball)
@@ -162,6 +288,740 @@ class EcsTest(unittest.TestCase):
         entities.delete_buffer_purge()
         self.assertEqual(len(list(entities.get_by_class(Player))), 0)
 
+    def test_entitymanager_delete_order(self):
+        balls = [Ball(i, i) for i in range(5)]
+        entities = EntityManager()
+        entities.add(*balls)
+        entities.delete(balls[1])
+        self.assertEqual(list(entities.get_by_class(Ball)), [balls[0], balls[4], balls[2], balls[3]])
+        entities.delete(balls[3], balls[0])
+        self.assertEqual(list(entities.get_by_class(Ball)), [balls[2], balls[4]])
+        with self.assertRaises(ValueError):
+            entities.delete(balls[0])
+        with self.assertRaises(KeyError):
+            entities.delete(Player('Ivan', 20, 1, 2))
+        with self.assertRaises(ValueError):
+            entities.add(balls[2])  # *already in world
+        entities.delete(balls[2])
+        self.assertEqual((list(entities.get_by_class(Ball)), entities._id_entity_list.count(balls[2])), ([balls[4]], 0))
+
+        entities = EntityManager(stable_order=True)
+        entities.add(*balls)
+        entities.delete(balls[1], balls[3])
+        with self.assertRaises(ValueError):
+            entities.delete(balls[1])
+        entities.add(balls[1])
+        self.assertEqual(list(entities.get_by_class(Ball)), [balls[0], balls[2], balls[4], balls[1]])
+        self.assertEqual(list(entities.get_with_component(ComPosition)), [balls[0], balls[2], balls[4], balls[1]])
+        entities.delete(balls[4], balls[0])
+        self.assertEqual(list(entities.get_with_component(ComPosition)), [balls[2], balls[1]])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_entitymanager_columnar(self):
+        entities = EntityManager()
+        entities.register(Particle, columnar=True)
+        entities.register(Particle, columnar=True)
+        with self.assertRaises(ValueError):
+            entities.register(Particle)
+        with self.assertRaises(TypeError):
+            entities.register(Player, columnar=True)
+
+        entities.add(*(Particle(x=i, y=i * 2, speed_x=0.5) for i in range(100)), Ball(1, 1))
+        particles = list(entities.get_by_class(Particle))
+        self.assertEqual(len(particles), 100)
+        self.assertEqual(len(list(entities.get_with_component(ComPosition))), 101)
+        self.assertIsInstance(particles[3], Particle)
+        self.assertFalse(hasattr(particles[3], '__dict__'))
+        self.assertEqual((particles[3].x, particles[3].y, particles[3].speed_x), (3, 6, 0.5))
+        self.assertIs(type(particles[3].x), int)
+        particles[3].x = 33
+        self.assertEqual(particles[3].x, 33)
+
+        entities.delete(particles[0])
+        with self.assertRaises(ValueError):
+            entities.delete(particles[0])
+        self.assertEqual((particles[0].x, particles[0].y), (0, 0))  # *deleted row proxy keeps its values
+        with self.assertRaises(ValueError):
+            entities.add(particles[1])  # *already in world
+        entities.add(particles[0])
+        self.assertIs(list(entities.get_by_class(Particle))[-1], particles[0])
+        entities.delete(particles[0])
+        particle = entities.spawn(Particle, x=7)
+        self.assertIs(entities.get(entities.get_id(particle)), particle)
+        entities.delete(particle)
+        with self.assertRaises(ValueError):
+            entities.set_pool(Particle, 2)
+        particles = list(entities.get_by_class(Particle))
+        self.assertEqual(len(particles), 99)
+        self.assertEqual((particles[0].x, particles[0].y), (99, 198))  # *the last row took place of deleted one
+        entities.delete(*particles)
+        self.assertEqual(list(entities.get_with_component(ComSpeed)), [])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_vector_system(self):
+        entities = EntityManager()
+        entities.register(Particle, columnar=True)
+        sys_move = SysMove(entities)
+        sys_move.update()  # no rows
+        entities.add(Particle(x=1, y=2, speed_x=1., speed_y=2.), Particle(x=3, y=4, speed_x=3.), Ball(0, 0))
+        self.assertEqual(len(list(entities.get_columns(ComPosition))), 1)
+        self.assertEqual(len(list(entities.get_columns(ComPerson))), 0)
+        sys_move.update()
+        sys_move.update()
+        self.assertEqual([(i.x, i.y) for i in entities.get_with_component(ComPosition)], [(3, 6), (9, 4), (0, 0)])
+        self.assertEqual(len(SystemManager([sys_move])._system_with_update_list), 1)
+        with self.assertRaises(TypeError):
+            type('SysEmpty', (VectorSystem,), {})
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_entitymanager_gather_scatter(self):
+        entities = EntityManager()
+        entities.add(Player('Ivan', 20, 1, 2), Ball(3, 4), Ball(5, 6))
+        x, y = entities.gather(('x', 'y'), ComPosition)
+        self.assertEqual((x.tolist(), y.tolist()), ([1, 3, 5], [2, 4, 6]))
+        x += 10
+        y *= 2
+        entities.scatter(('x', 'y'), ComPosition)
+        self.assertEqual([(i.x, i.y) for i in entities.get_with_component(ComPosition)], [(11, 4), (13, 8), (15, 12)])
+        self.assertIs(type(next(entities.get_by_class(Ball)).x), int)
+
+        health, = entities.gather(('health',), ComPerson, dtype=int)
+        health -= 5
+        entities.scatter(('health',), ComPerson, dtype=int)
+        self.assertEqual(next(entities.get_by_class(Player)).health, 15)
+        self.assertIs(type(next(entities.get_by_class(Player)).health), int)
+
+        entities.add(*(Ball(i, i) for i in range(100)))
+        x2, y2 = entities.gather(('x', 'y'), ComPosition)
+        self.assertEqual(len(x2), 103)
+        with self.assertRaises(ValueError):
+            entities.gather(('x; import os',), ComPosition)
+
+    def test_entitymanager_id(self):
+        player = Player('Ivan', 20, 1, 2)
+        ball1, ball2 = Ball(1, 1), Ball(2, 2)
+        entities = EntityManager()
+        entities.add(player, ball1)
+        player_id, ball1_id = entities.get_id(player), entities.get_id(ball1)
+        self.assertNotEqual(player_id, ball1_id)
+        self.assertIs(entities.get(player_id), player)
+        self.assertIs(entities.get(ball1_id), ball1)
+        self.assertTrue(entities.is_alive(ball1_id))
+        with self.assertRaises(KeyError):
+            entities.get_id(ball2)
+        with self.assertRaises(KeyError):
+            entities.get(123456)
+        self.assertFalse(entities.is_alive(123456))
+
+        entities.delete(ball1)
+        self.assertFalse(entities.is_alive(ball1_id))
+        with self.assertRaises(KeyError):
+            entities.get(ball1_id)
+        with self.assertRaises(KeyError):
+            entities.get_id(ball1)
+
+        entities.add(ball2)  # index of deleted entity is reused with new generation
+        ball2_id = entities.get_id(ball2)
+        self.assertNotEqual(ball2_id, ball1_id)
+        self.assertFalse(entities.is_alive(ball1_id))
+        self.assertIs(entities.get(ball2_id), ball2)
+        self.assertIs(entities.get(player_id), player)
+
+    def test_entitymanager_query_filter(self):
+        player, ball, particle = Player('Ivan', 20, 1, 2), Ball(13, 24), Particle(1., 1., 3, 4)
+        entities = EntityManager()
+        entities.add(player, ball, particle)
+        self.assertEqual(list(entities.get_with_component(ComPosition, without=(ComPerson,))), [ball, particle])
+        self.assertEqual(list(entities.get_with_component(ComPosition, without=(ComPerson, ComSpeed))), [ball])
+        self.assertEqual(list(entities.get_with_component(any_of=(ComPerson, ComSpeed))), [player, particle])
+        self.assertEqual(list(entities.get_with_component(ComPosition, any_of=(ComSpeed,), without=(ComPerson,))),
+                         [particle])
+        self.assertEqual(list(entities.get_with_component(ComPosition, without=(ComPerson,))), [ball, particle])
+        self.assertEqual(entities.query_cache_info(), (1, 4, 4))
+
+    def test_query(self):
+        entities = EntityManager()
+        query = entities.query(ComPosition, without=(ComSpeed,))
+        self.assertIsInstance(query, Query)
+        self.assertEqual((len(query), list(query), query.first()), (0, [], None))
+        with self.assertRaises(ValueError):
+            query.single()
+
+        player = Player('Ivan', 20, 1, 2)
+        entities.add(player, Particle(1., 1., 3, 4))
+        self.assertEqual((len(query), list(query), query.first(), query.single()), (1, [player], player, player))
+
+        balls = [Ball(i, i) for i in range(5)]
+        entities.add(*balls)
+        self.assertEqual(len(query), 6)
+        self.assertEqual(list(query), [player] + balls)
+        with self.assertRaises(ValueError):
+            query.single()
+        self.assertEqual(list(query.chunks(2)), [[player], balls[0:2], balls[2:4], balls[4:]])
+
+        entities.delete(player, balls[0])
+        self.assertEqual(len(query), 4)
+        self.assertEqual(query.first(), balls[4])
+        entities = EntityManager(stable_order=True)
+        query = entities.query(ComPosition)
+        entities.add(*balls)
+        entities.delete(balls[0])
+        self.assertEqual(list(query), balls[1:])
+
+    def test_entitymanager_component_index(self):
+        entities = EntityManager()
+        ball_class_list = [entity(type('Ball{}'.format(i), (ComPosition,), {})) for i in range(200)]
+        entities.register(*ball_class_list, Player, Particle)
+        self.assertEqual(entities._match_entity_classes((ComPerson,)), [Player])
+        self.assertEqual(entities._match_entity_classes((ComPosition, ComSpeed)), [Particle])
+        self.assertEqual(entities._match_entity_classes((ComPosition,), without=(ComPerson, ComSpeed)), ball_class_list)
+        self.assertEqual(entities._match_entity_classes((), any_of=(ComSpeed, ComPerson)), [Player, Particle])
+        self.assertEqual(entities._match_entity_classes((ComPosition, Ball)), [])
+        self.assertEqual(len(entities._match_entity_classes(())), 202)
+        self.assertEqual(len(entities._component_bit_map), 200 + 2 + 3)  # *entity classes are in index too
+
+    def test_entitymanager_buffer(self):
+        for stable_order in (False, True):
+            balls = [Ball(i, i) for i in range(10)]
+            player1, player2 = Player('Ivan', 20, 1, 2), Player('Vladimir', 30, 3, 4)
+            entities = EntityManager(stable_order=stable_order)
+            entities.add(*balls, player1)
+            player1_id = entities.get_id(player1)
+            for ball in entities.get_by_class(Ball):  # *change world while iterating
+                if ball.x % 2:
+                    entities.buffer_delete(ball, ball)
+                    entities.buffer_add(Ball(ball.x * 10, 0))
+            entities.buffer_clear(Player, Player)
+            entities.buffer_add(player2)
+            self.assertEqual(len(list(entities.get_by_class(Ball))), 10)
+            entities.buffer_apply()
+            ball_x_list = [i.x for i in entities.get_by_class(Ball)]
+            self.assertEqual(sorted(ball_x_list), [0, 2, 4, 6, 8, 10, 30, 50, 70, 90])
+            if stable_order:
+                self.assertEqual(ball_x_list, [0, 2, 4, 6, 8, 10, 30, 50, 70, 90])
+            self.assertEqual(list(entities.get_by_class(Player)), [player2])
+            self.assertFalse(entities.is_alive(player1_id))
+            with self.assertRaises(KeyError):
+                entities.get_id(balls[1])
+            entities.buffer_apply()  # empty buffers
+
+            # many deletions - class list is rebuilt once
+            entities.delete_buffer_add(*balls[:-1], *balls)
+            entities.delete_buffer_purge()
+            self.assertEqual(len(list(entities.get_by_class(Ball))), 5)
+            for ball in balls:
+                with self.assertRaises(KeyError):
+                    entities.get_id(ball)
+            self.assertEqual(len(entities._entity_index_map[Ball]), 5)
+
+            # recording order: delete and clear cancel previous add
+            ball1, ball2, ball3 = Ball(), Ball(), Ball()
+            entities.buffer_add(ball1, ball2)
+            entities.buffer_delete(ball1)
+            entities.buffer_clear(Ball)
+            entities.buffer_add(ball3)
+            entities.buffer_apply()
+            self.assertEqual(list(entities.get_by_class(Ball)), [ball3])
+
+            # class of buffered entity is not registered - buffers are not stuck
+            entities.buffer_delete(SizedBall())
+            entities.buffer_apply()  # *skipped
+            entities.buffer_delete(ball3)
+            entities.buffer_clear(SizedBall)
+            with self.assertRaises(KeyError):
+                entities.buffer_apply()
+            self.assertEqual(list(entities.get_by_class(Ball)), [ball3])
+            entities.buffer_delete(ball3)
+            entities.buffer_apply()
+            self.assertEqual(list(entities.get_by_class(Ball)), [])
+
+    def test_entitymanager_delete_where_clear(self):
+        for stable_order in (False, True):
+            entities = EntityManager(stable_order=stable_order)
+            balls = [Ball(i, i) for i in range(10)]
+            players = [Player('Ivan', 20, 1, 2), Player('Vladimir', 30, 3, 4)]
+            entities.add(*balls, *players)
+            entities.delete(balls[0])
+            self.assertEqual(entities.delete_where(Ball, lambda i: i.x > 6), 3)
+            self.assertEqual(sorted(i.x for i in entities.get_by_class(Ball)), [1, 2, 3, 4, 5, 6])
+            query = entities.query(ComPosition)
+            self.assertEqual(entities.delete_where(query, lambda i: i.y in (1, 2, 3)), 4)  # *3 balls, 1 player
+            self.assertEqual(entities.delete_where(query, lambda i: False), 0)
+            self.assertEqual(sorted(i.x for i in entities.get_by_class(Ball)), [4, 5, 6])
+            self.assertEqual(len(query), 4)
+            for ball in balls[:4]:
+                with self.assertRaises(KeyError):
+                    entities.get_id(ball)
+            entities.delete(balls[5])  # *index is valid after rebuild
+            self.assertEqual(sorted(i.x for i in entities.get_by_class(Ball)), [4, 6])
+
+            self.assertEqual(entities.clear(Ball, Player), 3)
+            self.assertEqual(entities.clear(Ball), 0)
+            self.assertEqual(len(query), 0)
+            with self.assertRaises(KeyError):
+                entities.clear(Particle)
+            entities.add(balls[4])
+            self.assertEqual(list(query), [balls[4]])
+
+    def test_entitymanager_expire(self):
+        entities = EntityManager()
+        balls = [Ball(i, i) for i in range(5)]
+        entities.add(*balls[:3], expire_at=10.)
+        entities.add(*balls[3:])
+        entities.set_expire(5., balls[3])
+        entities.set_expire(20., balls[2])  # replace
+        with self.assertRaises(KeyError):
+            entities.set_expire(1., Ball(0, 0))
+        self.assertEqual(entities.timers_pending(), 4)
+        self.assertEqual(entities.expire(1.), 0)
+        self.assertEqual(entities.expire(5.), 1)
+        entities.delete_buffer_purge()
+        self.assertEqual(len(list(entities.get_by_class(Ball))), 4)
+
+        entities.delete(balls[0])  # deleted before expiration
+        self.assertEqual(entities.timers_pending(), 2)
+        entities.add(balls[0])
+        self.assertEqual(entities.expire(15.), 1)
+        entities.buffer_apply()
+        self.assertEqual(sorted(i.x for i in entities.get_by_class(Ball)), [0, 2, 4])
+        self.assertEqual(entities.expire(100.), 1)
+        entities.buffer_apply()
+        self.assertEqual(entities.timers_pending(), 0)
+        self.assertEqual(sorted(i.x for i in entities.get_by_class(Ball)), [0, 4])
+
+        # timers are dropped on delete and clear, heap does not grow with churn
+        entities.set_expire(1000., *entities.get_by_class(Ball))
+        entities.clear(Ball)
+        self.assertEqual((entities.timers_pending(), entities._expire_map), (0, {}))
+        for i in range(1000):
+            ball = Ball(i)
+            entities.add(ball, expire_at=1000. + i)
+            entities.delete(ball)
+        self.assertLess(len(entities._expire_heap), 100)
+
+    def test_entitymanager_spawn_many(self):
+        entities = EntityManager()
+        with self.assertRaises(TypeError):
+            Prefab(Player, speed=1)
+        player_prefab = Prefab(Player, health=100, y=5)
+        with self.assertRaises(TypeError):
+            entities.spawn_many(player_prefab, 2)  # *no name
+        with self.assertRaises(TypeError):
+            entities.spawn_many(player_prefab, 2, overrides={'name': ['a', 'b'], 'speed': [1, 2]})
+        with self.assertRaises(ValueError):
+            entities.spawn_many(player_prefab, 2, overrides={'name': ['a']})
+
+        entities.add(Ball())
+        entities.delete(*entities.get_by_class(Ball))
+        player_list = entities.spawn_many(player_prefab, 3, overrides={'name': ['a', 'b', 'c'], 'x': range(3)})
+        self.assertEqual(list(entities.get_by_class(Player)), player_list)
+        self.assertEqual([(i.name, i.health, i.x, i.y) for i in player_list], [
+            ('a', 100, 0, 5), ('b', 100, 1, 5), ('c', 100, 2, 5)])
+        self.assertEqual(len({entities.get_id(i) for i in player_list}), 3)
+        for player in player_list:
+            self.assertIs(entities.get(entities.get_id(player)), player)
+        entities.delete(player_list[0])
+        self.assertEqual(list(entities.get_with_component(ComPerson)), [player_list[2], player_list[1]])
+        self.assertEqual(entities.spawn_many(Prefab(Ball), 0), [])
+
+        # *InitVar and kw_only fields
+        sized_ball_list = entities.spawn_many(Prefab(SizedBall, scale=2.), 2, overrides={'w': [3., 4.], 'h': [1., 2.]})
+        self.assertEqual([(i.w, i.h) for i in sized_ball_list], [(6., 2.), (8., 4.)])
+        self.assertEqual(len(entities.spawn_many(Prefab(Ball), 2)), 2)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_entitymanager_spawn_many_columnar(self):
+        entities = EntityManager()
+        entities.register(Particle, columnar=True)
+        entities.add(Particle(x=-1))
+        particle_list = entities.spawn_many(
+            Prefab(Particle, speed_x=2.5), 100, overrides={'x': numpy.arange(100), 'y': list(range(100))})
+        particles = list(entities.get_by_class(Particle))
+        self.assertEqual(len(particles), 101)
+        self.assertEqual(particles[1:], particle_list)
+        self.assertEqual((particle_list[70].x, particle_list[70].y, particle_list[70].speed_x,
+                          particle_list[70].speed_y), (70, 70, 2.5, 0.))
+        self.assertTrue(entities.is_alive(entities.get_id(particle_list[70])))
+        entities.delete(particles[0])
+        self.assertEqual(next(entities.get_by_class(Particle)).x, 99)
+
+    def test_entitymanager_resource(self):
+        entities = EntityManager()
+        with self.assertRaises(ResourceNotFoundError):
+            entities.resource(Player)
+        with self.assertRaises(KeyError):
+            entities.resource(Player)
+        player1 = Player('Ivan', 20, 1, 2)
+        player2 = Player('Vladimir', 30, 3, 4)
+        entities.set_resource(player1, Ball())
+        self.assertIs(entities.resource(Player), player1)
+        entities.set_resource(player2)
+        self.assertIs(entities.resource(Player), player2)
+        with self.assertRaises(KeyError):
+            next(entities.get_by_class(Player))
+        self.assertEqual(list(entities.get_with_component(ComPosition)), [])
+        with self.assertRaises(KeyError):
+            entities.get_id(player2)
+
+        entities.delete_resource(Player, Ball)
+        with self.assertRaises(ResourceNotFoundError):
+            entities.resource(Ball)
+        with self.assertRaises(ResourceNotFoundError):
+            entities.delete_resource(Ball)
+
+    def test_entitymanager_events(self):
+        entities = EntityManager()
+        reader1 = entities.event_reader(Ball)
+        self.assertEqual((len(reader1), reader1.read()), (0, []))
+        ball1, ball2, ball3, player = Ball(1), Ball(2), Ball(3), Player('Ivan', 20)
+        entities.emit(ball1, player, ball2)
+        reader2 = entities.event_reader(Ball)
+        self.assertEqual(len(reader1), 2)
+        self.assertEqual(reader1.read(), [ball1, ball2])
+        self.assertEqual(reader1.read(), [])
+        self.assertEqual(entities.event_reader(Player).read(), [player])
+        with self.assertRaises(KeyError):
+            next(entities.get_by_class(Ball))
+
+        entities.events_update()  # *frame 2: events of frame 1 are alive
+        entities.emit(ball3)
+        self.assertEqual(reader1.read(), [ball3])
+        self.assertEqual(reader2.read(), [ball1, ball2, ball3])
+        entities.events_update()  # *frame 3
+        self.assertEqual(entities.event_reader(Ball).read(), [ball3])
+        reader3 = entities.event_reader(Ball)
+        entities.events_update()  # *frame 4
+        self.assertEqual(reader3.read(), [])  # *ball3 is dropped
+        entities.emit(ball1, ball2)
+        reader3.clear()
+        self.assertEqual((len(reader3), reader3.read(), reader2.read()), (0, [], [ball1, ball2]))
+
+    def test_entitymanager_get_changed(self):
+        entities = EntityManager()
+        with self.assertRaises(ValueError):
+            next(entities.get_changed(ComPosition, since=0))
+        with self.assertRaises(TypeError):
+            entities.register(Team, columnar=True)
+        team1, team2 = Team('a', 10, 1), Team('b', 10, 2)
+        entities.add(team1, team2)
+        team1.name = 'aa'  # *untracked
+        self.assertEqual(team1.score, 1)
+        self.assertFalse(hasattr(team1, '__dict__'))
+
+        sys_score_view = SysScoreView(entities)
+        system_manager = SystemManager([sys_score_view])
+        system_manager.update_systems()  # *created
+        system_manager.update_systems()  # *no changes
+        team2.score += 1
+        system_manager.update_systems()
+        team1.health = 5
+        system_manager.update_systems()
+        self.assertEqual(sys_score_view.changed_log, [['aa', 'b'], [], ['b'], []])
+        self.assertEqual(system_manager.frame, 4)
+
+        tick = entities.change_tick()
+        self.assertEqual(list(entities.get_changed(ComScore, since=tick)), [])
+        team1.score = 0
+        self.assertEqual(list(entities.get_changed(ComScore, since=tick - 1)), [team1])
+
+        # subclasses of entities
+        @component(track_changes=True)
+        class ComRank:
+            rank: int = 0
+
+        @entity
+        class BossTeam(Team):  # *tracked base entity
+            pass
+
+        @entity
+        class RankedTeam(ComRank, Team):  # *tracked base entity and new tracked component
+            pass
+
+        @entity
+        class ScoredBall(Ball, ComScore):  # *untracked base entity
+            pass
+
+        boss_team, ranked_team, scored_ball = BossTeam('c', 1, 1), RankedTeam('d', 1, 1, 1), ScoredBall(1, 2, 3)
+        entities = EntityManager()
+        entities.add(boss_team, ranked_team, scored_ball)
+        tick = entities.change_tick()
+        self.assertEqual(list(entities.get_changed(ComScore, since=tick - 1)), [boss_team, ranked_team, scored_ball])
+        ranked_team.rank = 2
+        scored_ball.x = 5  # *untracked
+        self.assertEqual(list(entities.get_changed(ComRank, since=tick - 1)), [ranked_team])
+        self.assertEqual((ranked_team.rank, scored_ball.x, scored_ball.score), (2, 5, 1))
+        self.assertFalse(hasattr(ranked_team, '__dict__') or hasattr(scored_ball, '__dict__'))
+        self.assertIsInstance(ranked_team, Team)
+
+    def test_system_manager_parallel(self):
+        log = []
+
+        class SysLog(System):
+            def __init__(self, name, reads, writes):
+                self.name, self.reads, self.writes = name, reads, writes
+
+            def update(self):
+                log.append(self.name)
+
+        sys_move = SysLog('move', (ComSpeed,), (ComPosition,))
+        sys_draw = SysLog('draw', (ComPosition,), ())
+        sys_score = SysLog('score', (ComPerson,), (ComScore,))
+        sys_speed = SysLog('speed', (), (ComSpeed,))
+        sys_unknown = SysLog('unknown', None, None)
+        sys_health = SysLog('health', (), (ComPerson,))
+        system_list = [sys_move, sys_draw, sys_score, sys_speed, sys_unknown, sys_health]
+
+        self.assertEqual(SystemManager(system_list).stages, ())
+        system_manager = SystemManager(system_list, workers=2)
+        self.assertEqual(system_manager.stages, (
+            (sys_move, sys_score), (sys_draw, sys_speed), (sys_unknown,), (sys_health,)))
+        system_manager.start_systems()
+        system_manager.update_systems()
+        self.assertEqual(sorted(log[:2]), ['move', 'score'])
+        self.assertEqual(sorted(log[2:4]), ['draw', 'speed'])
+        self.assertEqual(log[4:], ['unknown', 'health'])
+        self.assertEqual(sys_move.last_run_tick, sys_score.last_run_tick)
+        self.assertLess(sys_move.last_run_tick, sys_draw.last_run_tick)
+
+        sys_ball = SysLog('ball', (Ball,), ())
+        sys_player = SysLog('player', (), (Player,))
+        self.assertEqual(SystemManager([sys_move, sys_ball, sys_player], workers=2).stages, (
+            (sys_move,), (sys_ball, sys_player)))  # *entities contains ComPosition, but they are of other classes
+
+        # stable_order: tombstones of direct deletion are compacted once by parallel readers
+        entities = EntityManager(stable_order=True)
+        entities.add(*(Ball(i) for i in range(200)))
+        count_log = []
+
+        class SysDelete(System):
+            def update(self):
+                entities.delete(next(entities.get_by_class(Ball)), *list(entities.get_by_class(Ball))[-2:])
+
+        class SysCount(System):
+            reads, writes = (Ball,), ()
+
+            def update(self):
+                count_log.append(sum(1 for _ in entities.get_by_class(Ball)))
+
+        system_manager_stable = SystemManager([SysDelete(), *(SysCount() for _ in range(4))], workers=4)
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # *frequent thread switches
+        try:
+            for _ in range(60):
+                system_manager_stable.update_systems()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        system_manager_stable.stop_systems()
+        self.assertEqual(count_log, [i for i in range(197, 17, -3) for _ in range(4)])
+        self.assertEqual([i.x for i in entities.get_by_class(Ball)], list(range(60, 80)))
+
+        sys_draw.update = lambda: 1 / 0
+        with self.assertRaises(ZeroDivisionError):
+            system_manager.update_systems()
+        system_manager.stop_systems()
+
+    def test_entitymanager_parallel_for(self):
+        entities = EntityManager()
+        entities.add(*(Ball(i) for i in range(10)), *(Player('p', 10, i) for i in range(5)), Particle(x=100))
+
+        def chunk_fn(chunk):
+            for ball in chunk:
+                ball.y += 1
+                if ball.x == 3:
+                    entities.buffer_delete(ball)
+            return len(chunk)
+
+        self.assertEqual(entities.parallel_for(Ball, chunk_fn, chunk_size=3, workers=2), [3, 3, 3, 1])
+        self.assertEqual(sorted(entities.parallel_for(entities.query(ComPosition), chunk_fn, chunk_size=4)),
+                         [1, 1, 2, 4, 4, 4])
+        self.assertEqual(entities.parallel_for(Ball, chunk_fn, workers=1), [10])
+        entities.buffer_apply()
+        self.assertEqual(sorted(i.x for i in entities.get_by_class(Ball)), [0, 1, 2, 4, 5, 6, 7, 8, 9])
+        self.assertEqual({i.y for i in entities.get_with_component(ComPosition)}, {1, 3})
+        entities.clear(Ball)
+        self.assertEqual(entities.parallel_for(Ball, chunk_fn, workers=2), [])
+
+        with self.assertRaises(ZeroDivisionError):
+            entities.parallel_for(Player, lambda chunk: 1 / 0, chunk_size=1, workers=2)
+        self.assertEqual(entities.parallel_for(  # *nested call runs inline, no deadlock
+            Player, lambda chunk: sum(entities.parallel_for(Player, len, chunk_size=1, workers=2)), chunk_size=1,
+            workers=2), [4] * 4)
+
+    def test_system_manager_fixed_dt(self):
+        order_log = []
+
+        class SysLog(System):
+            def __init__(self, fixed=False, rate=1, hz=None):
+                self.fixed, self.rate, self.hz = fixed, rate, hz
+                self.log = []
+
+            def update(self):
+                self.log.append((self.tick, round(self.dt, 3)))
+                order_log.append(self)
+
+        sys_physics = SysLog(fixed=True)
+        sys_ai = SysLog(fixed=True, rate=4)
+        sys_draw = SysLog()
+        sys_fps = SysLog(hz=10)
+        system_manager = SystemManager([sys_physics, sys_ai, sys_draw, sys_fps], fixed_dt=0.02, max_fixed_steps=3)
+        for dt in (0.01, 0.03, 0.05, 0.2):
+            system_manager.update_systems(dt)
+        self.assertEqual(sys_physics.log, [(i, 0.02) for i in range(1, 8)])
+        self.assertEqual(sys_ai.log, [(4, 0.08)])
+        self.assertEqual(sys_draw.log, [(1, 0.01), (2, 0.03), (3, 0.05), (4, 0.2)])
+        self.assertEqual(sys_fps.log, [(4, 0.29)])
+        self.assertEqual((system_manager.frame, system_manager.fixed_tick), (4, 7))
+        self.assertAlmostEqual(system_manager.alpha, 0.5)  # *0.14 sec dropped by max_fixed_steps
+
+        order_log.clear()
+        sys_input = SysLog()
+        system_manager = SystemManager([sys_input, sys_physics, sys_draw], fixed_dt=0.02)
+        system_manager.update_systems(0.04)  # *fixed ticks at position of the first fixed system
+        self.assertEqual(order_log, [sys_input, sys_physics, sys_physics, sys_draw])
+
+        system_manager = SystemManager([sys_physics, sys_draw])  # *no fixed_dt
+        system_manager.update_systems()
+        self.assertEqual((sys_physics.log[-1], sys_draw.log[-1]), ((1, 0.0), (1, 0.0)))
+
+    def test_system_manager_enable_run_condition(self):
+        log = []
+
+        class SysLog(System):
+            def __init__(self, name):
+                self.name = name
+
+            def update(self):
+                log.append(self.name)
+
+        sys_a, sys_b, sys_c = SysLog('a'), SysLog('b'), SysLog('c')
+        system_manager = SystemManager([sys_a, sys_b, sys_c])
+        play = [False]
+        system_manager.set_run_condition(sys_b, lambda: play[0])
+        system_manager.update_systems()
+        self.assertEqual((log, system_manager.executed_cnt, system_manager.skipped_cnt), (['a', 'c'], 2, 1))
+
+        play[0] = True
+        system_manager.disable(sys_a, sys_a)
+        self.assertFalse(system_manager.is_enabled(sys_a))
+        log.clear()
+        system_manager.update_systems()
+        self.assertEqual((log, system_manager.executed_cnt, system_manager.skipped_cnt), (['b', 'c'], 2, 1))
+
+        system_manager.enable(sys_a)
+        system_manager.set_run_condition(sys_b, None)
+        play[0] = False
+        log.clear()
+        system_manager.update_systems()
+        self.assertEqual((log, system_manager.executed_cnt, system_manager.skipped_cnt), (['a', 'b', 'c'], 3, 0))
+
+        with self.assertRaises(ValueError):
+            system_manager.disable(SysLog('d'))
+        with self.assertRaises(ValueError):
+            system_manager.set_run_condition(SysLog('d'), lambda: True)
+
+    def test_system_manager_frame_budget(self):
+        log = []
+
+        class SysLog(System):
+            def __init__(self, name, priority=None):
+                self.name = name
+                self.priority = priority
+
+            def update(self):
+                log.append(self.name)
+
+        sys_low, sys_crit, sys_high = SysLog('l', 1), SysLog('c'), SysLog('h', 5)
+        system_manager = SystemManager([sys_low, sys_crit, sys_high], max_deferred_frames=2)
+        system_manager.update_systems()
+        self.assertEqual((log, system_manager.deferred_cnt), (['c', 'h', 'l'], 0))
+        self.assertGreater(system_manager.budget_used, 0)
+
+        system_manager.frame_budget = 0.0  # *exhausted by any work
+        for _ in range(2):
+            log.clear()
+            system_manager.update_systems()
+            self.assertEqual(log, ['c'])
+            self.assertEqual((system_manager.executed_cnt, system_manager.deferred_cnt), (1, 2))
+        log.clear()
+        system_manager.update_systems()  # *starvation protection
+        self.assertEqual((log, system_manager.deferred_cnt), (['c', 'h', 'l'], 0))
+
+        system_manager.frame_budget = 10.0
+        system_manager.update_systems()
+        self.assertTrue(9 < sys_high.budget_left <= 10)
+        self.assertEqual(system_manager.executed_cnt, 3)
+
+        sys_fixed = SysLog('f', 1)
+        sys_fixed.fixed = True
+        with self.assertRaises(ValueError):
+            SystemManager([sys_fixed], fixed_dt=0.1)
+
+    def test_entitymanager_pool(self):
+        entities = EntityManager()
+        ball = entities.spawn(Ball, 1, y=2)  # no pool
+        self.assertEqual(list(entities.get_by_class(Ball)), [ball])
+        with self.assertRaises(KeyError):
+            entities.pool_info(Ball)
+
+        entities.set_pool(Ball, 2)
+        entities.delete(ball)
+        ball_list = [entities.spawn(Ball, i, i) for i in range(3)]
+        self.assertIs(ball_list[0], ball)
+        self.assertEqual((ball.x, ball.y), (0, 0))
+        self.assertEqual(entities.pool_info(Ball), (0, 2, 1, 2, 1))
+
+        entities.delete_buffer_add(*ball_list)
+        entities.delete_buffer_purge()
+        self.assertEqual(entities.pool_info(Ball), (2, 2, 1, 2, 2))
+        ball2 = entities.spawn(Ball, x=5)
+        self.assertIn(ball2, ball_list)
+        self.assertEqual((ball2.x, ball2.y), (5, 0))  # *defaults are restored
+        self.assertEqual(list(entities.get_by_class(Ball)), [ball2])
+        entities.clear(Ball)
+        self.assertEqual(entities.pool_info(Ball).size, 2)
+
+        # stale delete buffer entry does not delete reused entity
+        ball3 = entities.spawn(Ball)
+        entities.delete_buffer_add(ball3)
+        entities.delete(ball3)
+        self.assertIs(entities.spawn(Ball), ball3)
+        entities.delete_buffer_purge()
+        self.assertEqual(list(entities.get_by_class(Ball)), [ball3])
+
+        # entity added back is removed from pool
+        entities.set_pool(Ball, 4)
+        entities.delete(ball3)
+        entities.add(ball3)
+        entities.delete(ball3)
+        self.assertEqual(entities.pool_info(Ball).size, 2)
+        spawned_set = {id(entities.spawn(Ball)) for _ in range(3)}
+        self.assertEqual(len(spawned_set), 3)
+
+        entities.set_pool(Ball, 0)
+        with self.assertRaises(KeyError):
+            entities.pool_info(Ball)
+
+    def test_entitymanager_query_cache(self):
+        entities = EntityManager()
+        entities.add(Player('Ivan', 20, 1, 2), Ball(13, 24))
+        self.assertEqual(len(list(entities.get_with_component(ComPosition))), 2)
+        self.assertEqual(len(list(entities.get_with_component(ComPosition))), 2)
+        self.assertEqual(entities.query_cache_info(), (1, 1, 1))
+
+        entities.add(Ball(1, 1))  # known class - plan is still valid
+        self.assertEqual(len(list(entities.get_with_component(ComPosition))), 3)
+        self.assertEqual(entities.query_cache_info(), (2, 1, 1))
+
+        @entity
+        class Wall(ComPosition):
+            pass
+
+        entities.add(Wall(5, 5))  # new class - plan resets
+        self.assertEqual(entities.query_cache_info().size, 0)
+        self.assertEqual(len(list(entities.get_with_component(ComPosition))), 4)
+        self.assertEqual(len(list(entities.get_with_component(ComPerson))), 1)
+        self.assertEqual(entities.query_cache_info(), (2, 3, 2))
+
     def test_system(self):
         player1 = Player('Ivan', 20, 1, 2)
         player2 = Player('Vladimir', 30, 3, 4)